@@ -0,0 +1,189 @@
+"""Column-oriented bulk input (CSV, Parquet and Arrow files).
+
+Instead of turning every row into a dictionary, the file is loaded as one
+sequence per column. Validation runs field by field over the columns, the
+salaries are kept as typed float arrays and the tax of all rows is computed
+in one TaxCalculator.calculate_tax_batch call. The letters of the valid rows
+are built from these results (iter_row_letters), so rendering, dry runs and
+the summary export never validate or calculate a row again.
+
+CSV files need a header row with the field names of a taxpayer record
+(first_name, last_name, sex, address, gross_salary, social_deduction,
+expenses and optionally id). Parquet (.parquet) and Arrow (.arrow, .feather)
+files need the optional pyarrow package.
+"""
+
+import csv
+import math
+from array import array
+from contextlib import nullcontext
+from typing import NamedTuple
+
+import TaxCalculator
+from RecordStream import POSITIONAL_ID_PREFIX, RecordIds, make_record_id, positional_prefix, shard_of
+from RecordValidator import DEFAULT_VALIDATOR
+from TaxPrinter import TaxLetter
+
+COLUMNAR_EXTENSIONS = ('.csv', '.parquet', '.arrow', '.feather')
+NUMERIC_FIELDS = ('gross_salary', 'social_deduction', 'expenses')
+
+
+class ColumnarBatch(NamedTuple):
+    """A validated column-oriented batch with the tax of every valid row."""
+    row_count: int
+    columns: dict         # field -> coerced values (None for rejected values)
+    errors: dict          # row index -> list of FieldError
+    ids: list             # record ID of every row
+    deductions: array     # per row, NaN for invalid rows
+    net_salaries: array
+    taxes: object         # NumPy array when NumPy is installed, else array('d')
+    percentages: object
+
+
+class RowLetter(NamedTuple):
+    """The record ID and the letter of one valid row of a ColumnarBatch."""
+    record_id: str
+    letter: TaxLetter
+
+
+def is_columnar_file(path):
+    """Return True if path has an extension handled by this module."""
+    return path.lower().endswith(COLUMNAR_EXTENSIONS)
+
+
+def _load_csv(path):
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        try:
+            header = [name.strip() for name in next(reader)]
+        except StopIteration:
+            return {}, 0
+        columns = [[] for _ in header]
+        appenders = [column.append for column in columns]
+        width = len(header)
+        row_count = 0
+        for row in reader:
+            if not row:
+                continue
+            row_count += 1
+            if len(row) < width:
+                row.extend([None] * (width - len(row)))
+            for append, value in zip(appenders, row):
+                append(value)
+    return dict(zip(header, columns)), row_count
+
+
+def _load_arrow_table(path):
+    # pyarrow is optional and slow to import, so it is only loaded once such a file is read
+    try:
+        import pyarrow.feather as feather
+        import pyarrow.parquet as parquet
+    except ImportError:
+        raise ValueError(f"Reading {path} requires the optional pyarrow package (pip install pyarrow).") from None
+    table = parquet.read_table(path) if path.lower().endswith('.parquet') else feather.read_table(path)
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if name in NUMERIC_FIELDS and column.null_count == 0 and str(column.type).startswith(('int', 'float', 'double')):
+            columns[name] = array('d', column.to_numpy())
+        else:
+            columns[name] = column.to_pylist()
+    return columns, table.num_rows
+
+
+def load_columns(path):
+    """Load a CSV, Parquet or Arrow file as columns.
+
+    Args:
+        path (str): Path to the input file.
+    Returns:
+        tuple: (columns, row_count) where columns maps each column name to a
+            sequence of row_count values.
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the format is unsupported or pyarrow is missing.
+    """
+    if path.lower().endswith('.csv'):
+        return _load_csv(path)
+    if is_columnar_file(path):
+        return _load_arrow_table(path)
+    raise ValueError(f"Unsupported columnar file type: {path}")
+
+
+def record_ids(columns, row_count, prefix=POSITIONAL_ID_PREFIX):
+    """Return the record ID of every row (see RecordStream.make_record_id)."""
+    ids = columns.get('id')
+    if ids is None:
+        return [make_record_id(None, index, prefix) for index in range(row_count)]
+    return [make_record_id(value, index, prefix) for index, value in enumerate(ids)]
+
+
+def shard_rows(ids, shard=None):
+    """Return the indexes of the rows that belong to shard = (shard_index, shard_count), or all rows."""
+    if not shard:
+        return range(len(ids))
+    shard_index, shard_count = shard
+    return [index for index, rid in enumerate(ids) if shard_of(rid, shard_count) == shard_index]
+
+
+def evaluate_columns(columns, row_count, validator=None, schedule=None, path=None, seen_ids=None):
+    """Validate a column-oriented batch and compute the tax of all valid rows.
+
+    A row whose record ID an earlier row already uses is invalid as well.
+    Args:
+        columns (dict): Column name -> sequence of values, as from load_columns.
+        row_count (int): Number of rows.
+        validator (RecordValidator): Validator to use (default is DEFAULT_VALIDATOR).
+        schedule (TaxSchedule): Tax schedule to apply (default is DEFAULT_SCHEDULE).
+        path (str): The input file; its name starts the positional record IDs.
+        seen_ids (RecordIds): The record IDs of the run so far, to also reject
+            IDs used in earlier input files (default: only compare the rows).
+    Returns:
+        ColumnarBatch: The coerced columns, the errors of invalid rows, the
+            record IDs and typed arrays of deductions, net salaries, taxes and rates.
+    """
+    clean, errors = (validator or DEFAULT_VALIDATOR).validate_columns(columns, row_count)
+    nan = math.nan
+    gross, social, expenses = (array('d', (nan if value is None else value for value in clean[field]))
+                               for field in NUMERIC_FIELDS)
+    deductions = array('d', map(float.__add__, social, expenses))
+    net_salaries = array('d', map(float.__sub__, gross, deductions))
+    taxes, percentages = TaxCalculator.calculate_tax_batch(net_salaries, schedule)
+    ids = record_ids(columns, row_count, positional_prefix(path) if path else POSITIONAL_ID_PREFIX)
+    with RecordIds() if seen_ids is None else nullcontext(seen_ids) as seen_ids:
+        duplicates = seen_ids.duplicates(enumerate(ids), path)
+    for index, error in duplicates.items():
+        errors.setdefault(index, []).append(error)
+    return ColumnarBatch(row_count, clean, errors, ids, deductions, net_salaries, taxes, percentages)
+
+
+def iter_row_letters(batch, shard=None):
+    """Yield the letter of every valid row of an evaluated batch, in row order.
+
+    The letters hold the same values prepare_letter computes for a record
+    dictionary, taken from the batch instead of validating and calculating
+    each row again.
+    Args:
+        batch (ColumnarBatch): The result of evaluate_columns.
+        shard (tuple): Only yield the rows of (shard_index, shard_count).
+    Yields:
+        tuple: (index, row_letter, errors). row_letter is a RowLetter and
+            errors None for a valid row; for an invalid row row_letter is
+            None and errors lists its FieldErrors.
+    """
+    clean = batch.columns
+    ids = batch.ids
+    first_names, last_names, sexes, addresses = (clean[field] for field in
+                                                  ('first_name', 'last_name', 'sex', 'address'))
+    gross = clean['gross_salary']
+    deductions, net_salaries = batch.deductions, batch.net_salaries
+    taxes, percentages = batch.taxes.tolist(), batch.percentages.tolist()
+    errors = batch.errors
+    for index in shard_rows(ids, shard):
+        if index in errors:
+            yield index, None, errors[index]
+            continue
+        letter = TaxLetter(first_names[index].capitalize(), last_names[index].capitalize(), sexes[index],
+                           addresses[index], gross[index], deductions[index], net_salaries[index],
+                           percentages[index], taxes[index])
+        yield index, RowLetter(ids[index], letter), None
@@ -6,14 +6,14 @@ with tax calculation and letter generation modules.
 
 from TaxPrinter import create_tax_letter
 from TaxCalculator import calculate_tax
-import re
+from RecordValidator import DEFAULT_VALIDATOR
 
 
 def requestInput():
     """Collect and validate tax information from user input.
     
-    Prompts user for personal and financial information with validation
-    for each field according to specific format requirements.
+    Prompts user for personal and financial information and validates each
+    field with the same rules as the JSON input (RecordValidator).
     
     Returns:
         dict: Dictionary containing validated user information with keys:
@@ -23,81 +23,28 @@ def requestInput():
 
     print("=== Enter Tax Information ===")
 
-    def get_name(prompt):
-        """Validate and return a name input.
-        
-        Allows Unicode letters (including accented characters), spaces,
-        apostrophes, and hyphens. Rejects digits and special characters.
-        """
-        pattern = re.compile(r"^[^\W\d_]+(?:[ '\-][^\W\d_]+)*$", re.UNICODE)
-        while True:
-            val = input(prompt).strip()
-            if not val:
-                print("Error: value cannot be empty.")
-                continue
-            if not pattern.fullmatch(val):
-                print("Error: name must contain only letters (including accented), spaces, apostrophes or hyphens (no digits or special characters).")
-                continue
-            return val
-
-    def get_address(prompt):
-        """Validate and return a Swiss address in format: Street Number Zipcode City."""
-        pattern = re.compile(
-            r"^[^\W\d_]+(?:[ '\-\.][^\W\d_]+)*\s+\d+[A-Za-z]?\s+\d{4}\s+[^\W\d_]+(?:[ '\-][^\W\d_]+)*$",
-            re.UNICODE,
-        )
-        while True:
-            val = input(prompt).strip()
-            if not val:
-                print("Error: value cannot be empty.")
-                continue
-            if not pattern.fullmatch(val):
-                print("Error: address must be in Swiss format (Street_name street_number Zipcode City). Street names can include multiple words with spaces or hyphens (e.g., 'General Weberstrasse', 'Main-Street').")
-                continue
-            return val
-
-    def get_sex(prompt):
-        """Validate and return sex as 'male' or 'female'.
-        
-        Accepts variations: male, female, m, f, man, woman.
-        Normalizes man/woman to male/female.
+    def get_field(field, prompt):
+        """Prompt until the value passes the shared record validation and return it coerced.
+
+        Names may contain Unicode letters (including accented characters),
+        addresses must be in Swiss format (Street_name street_number Zipcode City),
+        sex accepts male, female, m, f, man or woman and is normalized to 'M' or 'F',
+        and amounts must be non-negative numbers.
         """
-        valid = {"male", "female", "m", "f", "man", "woman"}
-        while True:
-            val = input(prompt).strip().lower()
-            if val not in valid:
-                print(f"Error: enter one of: male, female, man, woman, m, f.")
-                continue
-            if val == "man":
-                return "male"
-            elif val == "woman":
-                return "female"
-            return val
-
-    def get_number(prompt):
-        """Validate and return a non-negative decimal number."""
-        pattern = re.compile(r"^\d+(\.\d+)?$")
         while True:
-            s = input(prompt).strip()
-            if not s:
-                print("Error: value cannot be empty.")
-                continue
-            if not pattern.fullmatch(s):
-                print("Error: enter a numeric value (digits and optional single decimal point).")
-                continue
-            try:
-                return float(s)
-            except ValueError:
-                print("Error: invalid number format.")
+            value, error = DEFAULT_VALIDATOR.check_field(field, input(prompt))
+            if error is None:
+                return value
+            print(f"Error: {field.replace('_', ' ')} {error.message}.")
 
     person = {
-        "first_name": get_name("Enter first name: "),
-        "last_name": get_name("Enter last name: "),
-        "sex": get_sex("Enter sex (male/female): "),
-        "address": get_address("Enter address: "),
-        "gross_salary": get_number("Enter gross salary: "),
-        "social_deduction": get_number("Enter social deduction: "),
-        "expenses": get_number("Enter expenses: "),
+        "first_name": get_field("first_name", "Enter first name: "),
+        "last_name": get_field("last_name", "Enter last name: "),
+        "sex": get_field("sex", "Enter sex (male/female): "),
+        "address": get_field("address", "Enter address: "),
+        "gross_salary": get_field("gross_salary", "Enter gross salary: "),
+        "social_deduction": get_field("social_deduction", "Enter social deduction: "),
+        "expenses": get_field("expenses", "Enter expenses: "),
     }
 
     return person
@@ -124,7 +71,7 @@ def processConsoleInput():
         tax_info = calculate_tax(net_salary)
         create_tax_letter(formatted_name['first_name'], formatted_name['last_name'], sex, address,
                           gross_salary, total_deductions, net_salary,
-                          tax_info['percentage'], tax_info['tax'])
+                          tax_info.percentage, tax_info.tax)
 
         if not continue_prompt():
             print("Thank you. Exiting.")
@@ -148,7 +95,7 @@ def format_name(first_name, last_name):
 
 
 def format_sex(sex):
-    """Return uppercase first letter of sex designation."""
+    """Return uppercase first letter of sex designation ('M' or 'F')."""
     return sex[0].upper()
 
 
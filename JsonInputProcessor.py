@@ -1,69 +1,62 @@
 import json
 import TaxPrinter
 import TaxCalculator
-import re
 import os
+from collections import deque
+from itertools import islice
+from typing import NamedTuple
+from ColumnarInputProcessor import (RowLetter, evaluate_columns, is_columnar_file, iter_row_letters, load_columns,
+                                    record_ids, shard_rows)
+from LetterCache import DEFAULT_MAX_BYTES, LetterCache
+from LetterWriter import LetterWriter
+from RecordStream import (IdentifiedRecord, RecordIds, identify_records, positional_prefix, record_id,
+                          stream_json_records)
+from RecordValidator import DEFAULT_VALIDATOR
+from RunManifest import RunManifest
+from RunMetrics import enable_metrics, disable_metrics, get_metrics
+from TaxSummaryExporter import export_summary
 
 #file_path = 'D:/Desktop/LocalRepo/Python_Group_Project_Repo/Python_Code/tax_data.json'
 
-def validate_input(person):
+def validate_input(person, validator=None):
     """Validate a person record for required fields and correct data types.
 
     This function checks that a person dictionary contains all required fields
-    with valid values. It validates that name fields contain only alphabetic
-    characters, spaces, hyphens, and apostrophes. It also ensures that numeric
-    fields contain valid numbers and that gross_salary is non-negative.
+    with valid values, using the same rules as the console input. It validates
+    that name fields contain only letters (including accented ones) separated
+    by spaces, hyphens or apostrophes, that the address is a Swiss address and
+    that sex is one of male/female/m/f/man/woman. It also ensures that numeric
+    fields contain valid, non-negative numbers.
     Args:
         person (dict): A dictionary containing person data with the following keys:
             - first_name (str): The person's first name
             - last_name (str): The person's last name
             - sex (str): The person's sex
-            - address (str): The person's address
-            - gross_salary (float): The person's gross salary (must be non-negative)
+            - address (str): The person's address (Street_name street_number Zipcode City)
+            - gross_salary (float): The person's gross salary
             - social_deduction (float): The person's social deduction amount
             - expenses (float): The person's expenses amount
+        validator (RecordValidator): The compiled validator to use
+            (default is RecordValidator.DEFAULT_VALIDATOR).
     Returns:
         bool: True if the person record is valid, False otherwise.
     Side Effects:
         Prints error messages to stdout for each validation failure encountered.
     """
-    required_fields = ['first_name', 'last_name', 'sex', 'address', 'gross_salary', 'social_deduction', 'expenses']
-    name_pattern = re.compile(r"^[A-Za-z\s'\-]+$")
-    numeric_fields = ['gross_salary', 'social_deduction', 'expenses']
-    
-    for field in required_fields:
-        if field not in person or person[field] is None or (isinstance(person[field], str) and person[field].strip() == ""):
-            print(f"Error: Missing or invalid value for {field} in record: {person}")
-            return False
-        elif not name_pattern.match(str(person['first_name'])):
-            print(f"Error: Invalid first_name (contains special characters or digits): {person['first_name']}")
-            return False
-        elif not name_pattern.match(str(person['last_name'])):
-            print(f"Error: Invalid last_name (contains special characters or digits): {person['last_name']}")
-            return False
-        else:
-            for nf in numeric_fields:
-                try:
-                    val = float(person[nf])
-                except (TypeError, ValueError):
-                    print(f"Error: {nf} must be a number in record: {person}")
-                    return False
-                
-                if nf == 'gross_salary' and val < 0:
-                    print(f"Error: gross_salary must be non-negative in record: {person}")
-                    return False
-                else:
-                    return True
+    _, errors = (validator or DEFAULT_VALIDATOR).validate(person)
+    for error in errors:
+        print(f"Error: {error} in record: {person}")
+    return not errors
 
 # Prompts user for a valid JSON file path and returns it after validation
 def get_file_path():
     while True:
         path = input("Enter path to JSON file: ").strip().strip('"').strip("'")
         if not path:
-            print("No path entered. Please provide a path to a .json file.")
+            print("No path entered. Please provide a path to a .json or .jsonl file.")
             continue
-        if not path.lower().endswith('.json'):
-            print("The file must have a .json extension. Please try again.")
+        if not path.lower().endswith(('.json', '.jsonl')):
+            print("The file must have a .json or .jsonl extension. Please try again.")
             continue
         if not os.path.exists(path):
             print(f"File not found: {path}. Please provide a valid file path.")
@@ -88,46 +81,450 @@ def load_json_file(path):
         print(f"Error opening file: {e}. Please try again.")
     return None
 
+# Validates one person record and computes its TaxPrinter.TaxLetter, raising ValueError on bad input
+def prepare_letter(person, validator=None):
+    metrics = get_metrics()
+    with metrics.stage('validate'):
+        record, errors = (validator or DEFAULT_VALIDATOR).validate(person)
+    if errors:
+        raise ValueError("; ".join(str(error) for error in errors))
+    return letter_from_record(record)
+
+# Computes the TaxPrinter.TaxLetter of a RecordValidator.TaxRecord that already passed validation
+def letter_from_record(record):
+    with get_metrics().stage('calculate'):
+        total_deductions = record.social_deduction + record.expenses
+        net_salary = record.gross_salary - total_deductions
+        tax = TaxCalculator.calculate_tax(net_salary)
+    return TaxPrinter.TaxLetter(record.first_name.capitalize(), record.last_name.capitalize(), record.sex,
+                                record.address, record.gross_salary, total_deductions, net_salary,
+                                tax.percentage, tax.tax)
+
+# Yields the (index, IdentifiedRecord) pairs of path whose record ID no earlier record of the run used;
+# the others go to reject(index, error)
+def _unique_records(identified_records, path, seen_ids, reject, chunksize=1024):
+    for chunk in _chunked(identified_records, chunksize):
+        duplicates = seen_ids.duplicates(((index, item.record_id) for index, item in chunk), path)
+        for index, item in chunk:
+            if index in duplicates:
+                reject(index, duplicates[index])
+            else:
+                yield index, item
+
+# Yields (index, RowLetter) for the valid rows of an evaluated columnar batch; the others go to reject(index, error)
+def _columnar_letters(batch, shard, reject):
+    for index, row_letter, errors in iter_row_letters(batch, shard):
+        if row_letter is None:
+            reject(index, "; ".join(str(error) for error in errors))
+        else:
+            yield index, row_letter
+
+# Returns (record_id, letter) of an input item: a record dictionary, an IdentifiedRecord,
+# or a RowLetter already evaluated column-wise
+def _letter_of(person, index):
+    if isinstance(person, RowLetter):
+        return person
+    if isinstance(person, IdentifiedRecord):
+        return person.record_id, prepare_letter(person.record)
+    return record_id(person, index), prepare_letter(person)
+
+# Renders one person record as its own PDF, raising ValueError on bad input
+def _process_person(person, index, output_dir, writer=None, cache=None):
+    rid, letter = _letter_of(person, index)
+    return TaxPrinter.create_tax_letter(*letter, record_id=rid, output_dir=output_dir, writer=writer, cache=cache)
+
 # Processes a single person record by extracting data, validating it, and generating tax letter
-def process_person(person):
+def process_person(person, index=0, output_dir=None, writer=None):
     try:
-        first_name = str(person.get('first_name', '')).strip().capitalize()
-        last_name = str(person.get('last_name', '')).strip().capitalize()
-        sex = person.get('sex', '')
-        address = person.get('address', '')
-        gross_salary = float(person.get('gross_salary', 0))
-        social_deduction = float(person.get('social_duction', 0))
-        expenses = float(person.get('expenses', 0))
+        return _process_person(person, index, output_dir, writer)
+    except ValueError as e:
+        print(f"Skipping record: {e}. Record: {person}")
     except Exception as e:
-        print(f"Skipping record due to read/convert error: {e}. Record: {person}")
-        return
+        print(f"Error processing record {person}: {e}")
+    return None
 
-    if validate_input(person):
+# Renders (index, person) pairs in this process, yielding (index, file_name, error) for each
+def _process_serial(indexed_people, output_dir, writer=None, cache=None):
+    for index, person in indexed_people:
         try:
-            total_deductions = social_deduction + expenses
-            net_salary = gross_salary - total_deductions
-            tax_info = TaxCalculator.calculate_tax(net_salary)
-            TaxPrinter.create_tax_letter(
-                first_name,
-                last_name,
-                sex,
-                address,
-                gross_salary,
-                total_deductions,
-                net_salary,
-                tax_info.get('percentage'),
-                tax_info.get('tax')
-            )
+            yield index, _process_person(person, index, output_dir, writer, cache), None
         except Exception as e:
-            print(f"Error processing record for {first_name} {last_name}: {e}")
+            yield index, None, str(e)
 
-# Main entry point that loads JSON file and processes all person records
-def processJSON():
-    path = get_file_path()
-    data = load_json_file(path)
-    if data is None or not isinstance(data, list):
-        print(f"Expected a JSON array of person records, but root is {type(data).__name__}. Please provide a JSON array.")
-        return
+# Runs one chunk of (index, person) pairs inside a worker process, returning its results
+# and, when collect_metrics is set, a snapshot of the chunk's stage timings
+def _process_chunk(chunk, output_dir, collect_metrics=False, writer_threads=0, cache_dir=None,
+                   cache_max_bytes=DEFAULT_MAX_BYTES):
+    metrics = enable_metrics() if collect_metrics else None
+    writer = LetterWriter(writer_threads) if writer_threads else None
+    cache = LetterCache.open(cache_dir, cache_max_bytes) if cache_dir else None
+    results = []
+    try:
+        for index, person in chunk:
+            try:
+                results.append((index, _process_person(person, index, output_dir, writer, cache), None))
+            except Exception as e:
+                results.append((index, None, str(e)))
+    finally:
+        if writer is not None:
+            failures = {path: error for path, error in writer.close()}
+            results = [(index, None, f"write failed: {failures[file_name]}") if file_name in failures
+                       else (index, file_name, error) for index, file_name, error in results]
+        if metrics is not None:
+            disable_metrics()
+    return results, metrics.snapshot() if metrics is not None else None
+
+# Splits an iterable into lists of at most size items
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def process_people_parallel(people, workers=None, chunksize=64, output_dir=None, writer_threads=0,
+                            cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES):
+    """Render tax letters for many records across a pool of worker processes.
+
+    Records are sent to the workers in chunks. At most two chunks per worker
+    are in flight at any time, so the input iterable is consumed lazily.
+    Args:
+        people (iterable): Person record dictionaries.
+        workers (int): Number of worker processes (default: CPU count).
+        chunksize (int): Number of records sent to a worker at once.
+        output_dir (str): Root directory of the sharded letter tree (default: current directory).
+        writer_threads (int): Threads per worker that write the rendered PDFs
+            in the background; 0 saves each letter synchronously.
+        cache_dir (str): Directory of a LetterCache shared by all workers; letters
+            with identical content are linked from it instead of rendered again.
+        cache_max_bytes (int): Size limit of the letter cache.
+    Yields:
+        tuple: (index, file_name, error) in input order. file_name is None
+            and error holds the reason when a record could not be processed.
+    """
+    return _process_parallel(enumerate(people), workers, chunksize, output_dir, writer_threads,
+                             cache_dir, cache_max_bytes)
+
+# Fans (index, person) pairs out to worker processes, yielding (index, file_name, error) in input order
+def _process_parallel(indexed_people, workers=None, chunksize=64, output_dir=None, writer_threads=0,
+                      cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES):
+    # Imported here: multiprocessing is only needed for parallel runs and slows down startup
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    metrics = get_metrics()
+
+    def collect(future):
+        results, snapshot = future.result()
+        if snapshot is not None:
+            metrics.merge(snapshot)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in _chunked(indexed_people, chunksize):
+            pending.append(executor.submit(_process_chunk, chunk, output_dir, metrics.enabled, writer_threads,
+                                           cache_dir, cache_max_bytes))
+            if len(pending) >= 2 * workers:
+                yield from collect(pending.popleft())
+        while pending:
+            yield from collect(pending.popleft())
+
+def process_people_combined(people, file_name, letters_per_file=None):
+    """Render all valid records as pages of one PDF (or of several shards).
+
+    Invalid records are reported and left out; see TaxPrinter.create_tax_letters_pdf
+    for the page index written next to the PDF.
+    Args:
+        people (iterable): Person record dictionaries.
+        file_name (str): Name of the combined PDF file.
+        letters_per_file (int): Optional number of letters per shard.
+    Returns:
+        tuple: (created, failed) record counts.
+    """
+    return _process_combined(enumerate(people), file_name, letters_per_file)
+
+# Renders (index, person) pairs as pages of one PDF, listing every page's record ID in the index
+def _process_combined(indexed_people, file_name, letters_per_file=None):
+    counts = {'created': 0, 'failed': 0}
+
+    def valid_letters():
+        for index, person in indexed_people:
+            try:
+                row_letter = _letter_of(person, index)
+            except ValueError as e:
+                counts['failed'] += 1
+                print(f"Record {index} skipped: {e}")
+                continue
+            counts['created'] += 1
+            yield row_letter
+
+    TaxPrinter.create_tax_letters_pdf(valid_letters(), file_name, letters_per_file)
+    return counts['created'], counts['failed']
+
+class FileSummary(NamedTuple):
+    """Record counts of one processed input file."""
+    succeeded: int
+    failed: int
+    skipped: int = 0
+
+# Validates one chunk of (index, IdentifiedRecord) pairs, returning {index: errors} for every invalid record
+def _validate_chunk(chunk):
+    validate = DEFAULT_VALIDATOR.validate
+    rejects = {}
+    for index, (_, person) in chunk:
+        _, errors = validate(person)
+        if errors:
+            rejects[index] = errors
+    return rejects
+
+# Validates (index, IdentifiedRecord) chunks on worker processes, yielding the rejects of each chunk in input order
+def _validate_parallel(chunks, workers):
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((executor.submit(_validate_chunk, chunk), chunk))
+            if len(pending) >= 2 * workers:
+                future, chunk = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            future, chunk = pending.popleft()
+            yield chunk, future.result()
 
-    for person in data:
-        process_person(person)
+def validate_file(path, rejects_file=None, workers=1, chunksize=1024, shard=None, seen_ids=None):
+    """Validate every record of an input file in one pass and report all rejects.
+
+    Nothing is calculated or rendered, so a whole file can be checked before
+    a long run. JSON input is validated in chunks, on worker processes when
+    workers > 1; columnar input is validated column by column.
+    Args:
+        path (str): Path to the .json, .jsonl, .csv, .parquet, .arrow or .feather input file.
+        rejects_file: Optional text file; one JSON line is written per invalid record
+            with the input file, its index and record_id, every field error and the record.
+        workers (int): Number of worker processes for JSON input.
+        chunksize (int): Number of records validated per chunk.
+        shard (tuple): Only validate the records of (shard_index, shard_count).
+        seen_ids (RecordIds): The record IDs of the run so far, to also reject IDs
+            used in earlier input files (default: only compare the records of path).
+    Returns:
+        FileSummary: valid and invalid record counts.
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file cannot be parsed.
+    """
+    if seen_ids is None:
+        with RecordIds() as seen_ids:
+            return validate_file(path, rejects_file, workers, chunksize, shard, seen_ids)
+    metrics = get_metrics()
+
+    def write_reject(index, rid, errors, person):
+        print(f"Record {index} rejected: {'; '.join(str(error) for error in errors)}")
+        if rejects_file is not None:
+            rejects_file.write(json.dumps({
+                'file': path, 'index': index, 'record_id': rid,
+                'errors': [{'field': error.field, 'message': error.message, 'value': error.value}
+                           for error in errors],
+                'record': person,
+            }, ensure_ascii=False, default=str) + '\n')
+
+    if is_columnar_file(path):
+        with metrics.stage('parse'):
+            columns, row_count = load_columns(path)
+        with metrics.stage('validate'):
+            _, errors_by_row = DEFAULT_VALIDATOR.validate_columns(columns, row_count)
+            ids = record_ids(columns, row_count, positional_prefix(path))
+            for index, error in seen_ids.duplicates(enumerate(ids), path).items():
+                errors_by_row.setdefault(index, []).append(error)
+        rows = shard_rows(ids, shard)
+        invalid = 0
+        for index in rows:
+            if index in errors_by_row:
+                invalid += 1
+                write_reject(index, ids[index], errors_by_row[index],
+                             {name: column[index] for name, column in columns.items()})
+        valid = len(rows) - invalid
+    else:
+        records = metrics.timed_iter('parse', stream_json_records(path))
+        chunks = _chunked(identify_records(records, path, shard), chunksize)
+        if workers > 1:
+            results = _validate_parallel(chunks, workers)
+        else:
+            results = ((chunk, _validate_chunk(chunk)) for chunk in chunks)
+        valid = invalid = 0
+        for chunk, rejects in results:
+            # IDs are compared across chunks and input files, so duplicates are found here instead of in the workers
+            duplicates = seen_ids.duplicates(((index, item.record_id) for index, item in chunk), path)
+            for index, error in duplicates.items():
+                rejects.setdefault(index, []).append(error)
+            items = dict(chunk) if rejects else None
+            for index in sorted(rejects):
+                rid, person = items[index]
+                write_reject(index, rid, rejects[index], person)
+            invalid += len(rejects)
+            valid += len(chunk) - len(rejects)
+    metrics.count('records_ok', valid)
+    metrics.count('records_failed', invalid)
+    return FileSummary(valid, invalid)
+
+def process_file(path, workers=1, combined_file=None, letters_per_file=None, output_dir=None, dry_run=False,
+                 writer_threads=0, manifest_path=None, cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES,
+                 summary_file=None, summary_format='csv', shard=None, seen_ids=None):
+    """Process every record of an input file without prompting.
+
+    JSON arrays and JSON Lines files are streamed record by record. CSV,
+    Parquet and Arrow files are loaded, validated and calculated column-wise
+    (see ColumnarInputProcessor), and their letters are built from the results.
+    Args:
+        path (str): Path to the .json, .jsonl, .csv, .parquet, .arrow or .feather input file.
+        workers (int): Number of worker processes; 1 renders in this process.
+        combined_file (str): Render all letters as pages of this PDF instead of one file each.
+        letters_per_file (int): Optional number of letters per combined PDF shard.
+        output_dir (str): Root directory of the sharded letter tree (default: current directory).
+        dry_run (bool): Only validate records and calculate their tax, render nothing.
+        writer_threads (int): Render letters in memory and write them on this many
+            background threads (per worker process); 0 saves each letter synchronously.
+        manifest_path (str): Checkpoint manifest (see RunManifest). Records already
+            rendered according to it are skipped, and every outcome is appended to it.
+            Not used for combined or dry runs.
+        cache_dir (str): Directory of a LetterCache; letters with identical content
+            are linked from it instead of rendered again. Not used for combined runs.
+        cache_max_bytes (int): Size limit of the letter cache.
+        summary_file (str): Only calculate and write the tax figures of all records
+            to this file (see TaxSummaryExporter) instead of rendering letters.
+        summary_format (str): Format of summary_file: 'csv', 'jsonl' or 'sqlite'.
+        shard (tuple): (shard_index, shard_count) to only process the records that
+            RecordStream.shard_of assigns to shard_index, e.g. on one of several nodes.
+        seen_ids (RecordIds): The record IDs of the run so far. A record whose ID an
+            earlier record of the run (or of path) uses is rejected, as its letter
+            would overwrite the earlier one (default: only compare the records of path).
+    Returns:
+        FileSummary: succeeded, failed and skipped record counts.
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a valid JSON array or JSON Lines file, or the
+            columnar format cannot be read.
+    """
+    if seen_ids is None:
+        with RecordIds() as seen_ids:
+            return process_file(path, workers, combined_file, letters_per_file, output_dir, dry_run, writer_threads,
+                                manifest_path, cache_dir, cache_max_bytes, summary_file, summary_format, shard,
+                                seen_ids)
+    metrics = get_metrics()
+
+    def summary(succeeded, failed, skipped=0):
+        metrics.count('records_ok', succeeded)
+        metrics.count('records_failed', failed)
+        metrics.count('records_skipped', skipped)
+        return FileSummary(succeeded, failed, skipped)
+
+    if summary_file and not dry_run:
+        return summary(*export_summary(path, summary_file, summary_format, shard=shard, seen_ids=seen_ids))
+
+    succeeded = failed = 0
+
+    def reject(index, error):
+        nonlocal failed
+        failed += 1
+        print(f"Record {index} skipped: {error}")
+
+    columnar = is_columnar_file(path)
+    if columnar:
+        # Validated and calculated column by column; only the letters of valid rows are passed on
+        with metrics.stage('parse'):
+            columns, row_count = load_columns(path)
+        with metrics.stage('columnar_eval'):
+            batch = evaluate_columns(columns, row_count, path=path, seen_ids=seen_ids)
+        indexed_records = _columnar_letters(batch, shard, reject)
+    else:
+        records = metrics.timed_iter('parse', stream_json_records(path))
+        # Records sharing an ID would be written to the same letter file, so only the first one is kept
+        indexed_records = _unique_records(identify_records(records, path, shard), path, seen_ids, reject)
+
+    if combined_file and not dry_run:
+        # The page index lists record IDs, so they must be unique here as well
+        succeeded, combined_failed = _process_combined(indexed_records, combined_file, letters_per_file)
+        return summary(succeeded, failed + combined_failed)
+
+    if dry_run:
+        for index, person in indexed_records:
+            try:
+                _letter_of(person, index)
+                succeeded += 1
+            except ValueError as e:
+                failed += 1
+                print(f"Record {index} skipped: {e}")
+        return summary(succeeded, failed)
+
+    manifest = RunManifest(manifest_path) if manifest_path else None
+    pending_hashes = {}
+    skipped = 0
+
+    def unfinished_records():
+        nonlocal skipped
+        for index, person in indexed_records:
+            if columnar:
+                # Hashed like the row's raw values, so edits of any column mark it as changed
+                rid = person.record_id
+                raw = {name: column[index] for name, column in columns.items()}
+            else:
+                rid, raw = person
+            # The same record rendered into another directory or layout is not done yet
+            digest = RunManifest.record_hash(raw, rid, output_dir, TaxPrinter.LETTER_LAYOUT_VERSION)
+            if manifest.is_done(digest):
+                skipped += 1
+                continue
+            pending_hashes[index] = (digest, rid)
+            yield index, person
+
+    writer = LetterWriter(writer_threads) if writer_threads and workers <= 1 else None
+    cache = LetterCache.open(cache_dir, cache_max_bytes) if cache_dir and workers <= 1 else None
+    indexed_people = unfinished_records() if manifest else indexed_records
+    queued = {}    # file_name -> (hash, record_id) of letters handed to the writer, see below
+    try:
+        if workers <= 1:
+            results = _process_serial(indexed_people, output_dir, writer, cache)
+        else:
+            results = _process_parallel(indexed_people, workers, output_dir=output_dir, writer_threads=writer_threads,
+                                        cache_dir=cache_dir, cache_max_bytes=cache_max_bytes)
+        for index, file_name, error in results:
+            if error:
+                failed += 1
+                print(f"Record {index} skipped: {error}")
+            else:
+                succeeded += 1
+            if manifest:
+                digest, rid = pending_hashes.pop(index)
+                manifest.record(digest, rid, file_name, error)
+                if writer is not None and not error:
+                    queued[file_name] = (digest, rid)
+    finally:
+        if writer is not None:
+            # A queued letter is recorded before it is written; once a write fails, its entry is
+            # superseded by a failed one, so a rerun with the manifest renders the letter again
+            write_failures = writer.close()
+            succeeded -= len(write_failures)
+            failed += len(write_failures)
+            for file_name, error in write_failures:
+                if file_name in queued:
+                    digest, rid = queued.pop(file_name)
+                    manifest.record(digest, rid, file_name, f"write failed: {error}")
+        if manifest:
+            manifest.close()
+
+    if skipped:
+        print(f"Skipped {skipped} records already rendered according to {manifest_path}.")
+    return summary(succeeded, failed, skipped)
+
+# Main entry point that prompts for a JSON file and processes all person records
+def processJSON(workers=1, combined_file=None, letters_per_file=None, output_dir=None):
+    path = get_file_path()
+    try:
+        created, failed, _ = process_file(path, workers, combined_file, letters_per_file, output_dir)
+    except PermissionError:
+        print(f"Permission denied when opening: {path}. Choose another file or adjust permissions.")
+    except OSError as e:
+        print(f"Error reading file: {e}. Please try again.")
+    except ValueError as e:
+        print(f"Invalid JSON in file: {path}. Error: {e}. Please provide a valid JSON file.")
+    else:
+        print(f"Processed {created + failed} records: {created} letters created, {failed} failed.")
@@ -0,0 +1,120 @@
+"""Content-addressed on-disk cache of rendered tax letters.
+
+Identical letter inputs (name, sex, address and figures) always produce the
+same letter, so a letter rendered once can be reused in later runs. Letters
+are stored under the SHA-256 hash of their inputs; a cache hit is served by
+hard-linking (or, across file systems, copying) the cached PDF to the
+requested path instead of rendering it again. When the cache grows beyond its
+size limit, the least recently used letters are evicted.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# One cache object per directory and process, so the size scan happens once per process
+_open_caches = {}
+
+
+class LetterCache:
+    """Size-bounded LRU cache of PDF letters keyed by a hash of their inputs.
+
+    Args:
+        directory: The cache directory (created if missing). Several processes
+            may share it.
+        max_bytes: Evict least recently used letters once the cache is larger
+            than this (default is 1 GiB).
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry_size for _, _, entry_size in self._entries())
+
+    @classmethod
+    def open(cls, directory, max_bytes=DEFAULT_MAX_BYTES):
+        """Return the cache for directory, reusing an already opened one in this process."""
+        key = (os.path.abspath(directory), max_bytes)
+        cache = _open_caches.get(key)
+        if cache is None:
+            cache = _open_caches[key] = cls(directory, max_bytes)
+        return cache
+
+    @staticmethod
+    def key(**letter_fields):
+        """Return the cache key of a letter, given all inputs that affect its content."""
+        canonical = json.dumps(letter_fields, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def _entries(self):
+        """Yield (path, mtime, size) of every cached letter."""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.pdf'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_mtime, stat.st_size
+
+    def fetch(self, key, destination):
+        """Place the cached letter for key at destination.
+
+        Returns:
+            bool: True on a cache hit, False if the letter has to be rendered.
+        """
+        cached = self._path(key)
+        try:
+            os.utime(cached)    # mark as recently used for the LRU eviction
+        except OSError:
+            return False
+        directory = os.path.dirname(destination)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            if os.path.lexists(destination):
+                os.remove(destination)
+            try:
+                os.link(cached, destination)
+            except OSError:
+                shutil.copyfile(cached, destination)
+        except OSError:
+            return False    # evicted by another process in the meantime
+        return True
+
+    def store(self, key, data):
+        """Add the rendered PDF bytes of a letter to the cache."""
+        cached = self._path(key)
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        partial = f"{cached}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(partial, 'wb') as file:
+            file.write(data)
+        os.replace(partial, cached)
+        with self._lock:
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Remove least recently used letters until the cache is at 90% of its limit."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        self._size = sum(entry_size for _, _, entry_size in entries)
+        target = self.max_bytes * 0.9
+        for path, _, entry_size in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= entry_size
@@ -0,0 +1,276 @@
+"""Local HTTP service that renders tax letters on demand.
+
+Starting the interpreter and importing ReportLab takes longer than rendering
+a single letter, so the counter workflow keeps one long-running service with
+a pool of pre-warmed worker processes instead of starting the program for
+every taxpayer:
+
+    POST /letter    taxpayer record as JSON -> the PDF letter
+                    (422 with the field errors if the record is invalid,
+                    503 if all render slots stay busy)
+    GET  /metrics   request counters and latency percentiles as JSON
+    GET  /health    "ok"
+
+Records go through the same validation, calculate_tax and letter rendering
+as the batch mode. The number of letters rendered at once is bounded; a
+request that cannot get a render slot within the queue timeout is rejected
+instead of piling up.
+"""
+
+import json
+import os
+import re
+import signal
+import threading
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+import TaxPrinter
+from JsonInputProcessor import letter_from_record
+from RecordValidator import DEFAULT_VALIDATOR
+
+MAX_BODY_BYTES = 64 * 1024
+DEFAULT_QUEUE_TIMEOUT = 5.0
+LATENCY_WINDOW = 1000    # number of recent requests the latency percentiles are computed over
+
+# Throwaway letter rendered by every worker on start, so fonts and ReportLab are loaded up front
+_WARMUP_LETTER = {
+    'first_name': "Anna", 'last_name': "Muster", 'sex': "F", 'address': "Bahnhofstrasse 1 8001 Zürich",
+    'gross_income': 80000.0, 'deductible': 9000.0, 'net_salary': 71000.0,
+    'tax_percentage': 16.0, 'tax_amount': 11360.0,
+}
+
+
+def _warm_worker():
+    # Ctrl+C reaches the whole process group; only the main process handles it and stops the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    TaxPrinter.render_tax_letter(**_WARMUP_LETTER)
+
+
+def content_disposition(file_name):
+    """Return a Content-Disposition header value for file_name.
+
+    HTTP header values are sent as Latin-1, so the plain filename parameter is
+    folded to ASCII; the exact UTF-8 name goes into an RFC 5987 filename*.
+    """
+    folded = unicodedata.normalize('NFKD', file_name).encode('ascii', 'ignore').decode('ascii')
+    folded = re.sub(r"[^A-Za-z0-9._-]+", "_", folded).strip("_") or "tax_report_letter.pdf"
+    return f"attachment; filename=\"{folded}\"; filename*=UTF-8''{quote(file_name, safe='')}"
+
+
+class ServiceStats:
+    """Thread-safe request counters and a window of recent request latencies."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.counters = {'requests': 0, 'letters': 0, 'rejected': 0, 'busy': 0, 'errors': 0,
+                         'pool_restarts': 0}
+        self.in_flight = 0
+        self.started = time.time()
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def add_in_flight(self, delta):
+        with self._lock:
+            self.in_flight += delta
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def report(self):
+        """Return the counters and latency percentiles (in milliseconds) as a dictionary."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            report = {'uptime_seconds': time.time() - self.started, 'in_flight': self.in_flight,
+                      **self.counters}
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        report['latency_ms'] = {
+            'samples': len(latencies),
+            'p50': percentile(0.50) if latencies else None,
+            'p95': percentile(0.95) if latencies else None,
+            'p99': percentile(0.99) if latencies else None,
+            'max': latencies[-1] * 1000 if latencies else None,
+        }
+        return report
+
+
+class LetterService:
+    """Render letters for single records on a pool of pre-warmed worker processes.
+
+    If a worker process dies (e.g. killed for running out of memory), the
+    broken pool is replaced by a new pre-warmed one and the letter is
+    rendered once more on it.
+
+    Args:
+        workers: Number of worker processes (default: CPU count).
+        max_concurrent: Maximum number of letters rendered or queued in the
+            pool at once (default is two per worker).
+        queue_timeout: Seconds a request waits for a free slot before it is
+            rejected as busy.
+    """
+
+    def __init__(self, workers=None, max_concurrent=None, queue_timeout=DEFAULT_QUEUE_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_timeout = queue_timeout
+        self.stats = ServiceStats()
+        self._slots = threading.BoundedSemaphore(max_concurrent or 2 * self.workers)
+        self._pool_lock = threading.Lock()
+        self._executor = self._start_pool()
+
+    def _start_pool(self):
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        # Start every worker now instead of on the first requests
+        for future in [executor.submit(time.sleep, 0) for _ in range(self.workers)]:
+            future.result()
+        return executor
+
+    def _replace_pool(self, broken):
+        with self._pool_lock:
+            # Requests that failed on the same pool at once only replace it once
+            if self._executor is broken:
+                broken.shutdown(wait=False)
+                self._executor = self._start_pool()
+                self.stats.count('pool_restarts')
+
+    def render(self, letter):
+        """Render one letter.
+
+        Args:
+            letter (TaxPrinter.TaxLetter): The computed letter of a valid record.
+        Returns:
+            bytes: The PDF document, or None if no render slot became free in time.
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            return None
+        self.stats.add_in_flight(1)
+        try:
+            executor = self._executor
+            try:
+                return executor.submit(TaxPrinter.render_tax_letter, *letter).result()
+            except BrokenProcessPool:
+                self._replace_pool(executor)
+                return self._executor.submit(TaxPrinter.render_tax_letter, *letter).result()
+        finally:
+            self.stats.add_in_flight(-1)
+            self._slots.release()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class LetterRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end of a LetterService (set as the server's 'service' attribute)."""
+
+    server_version = "TaxLetterService/1.0"
+
+    def _send(self, status, body, content_type='application/json', headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send(HTTPStatus.OK, self.server.service.stats.report())
+        elif self.path == '/health':
+            self._send(HTTPStatus.OK, b"ok", 'text/plain')
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {'error': f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/letter':
+            self._send(HTTPStatus.NOT_FOUND, {'error': f"unknown path {self.path}"})
+            return
+        service = self.server.service
+        stats = service.stats
+        stats.count('requests')
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if not 0 < length <= MAX_BODY_BYTES:
+            stats.count('rejected')
+            self._send(HTTPStatus.BAD_REQUEST, {'error': f"expected a JSON body of 1 to {MAX_BODY_BYTES} bytes"})
+            return
+        try:
+            person = json.loads(self.rfile.read(length))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            stats.count('rejected')
+            self._send(HTTPStatus.BAD_REQUEST, {'error': f"invalid JSON: {e}"})
+            return
+
+        # Invalid records are answered here without occupying a render slot; workers only render
+        record, errors = DEFAULT_VALIDATOR.validate(person)
+        if errors:
+            stats.count('rejected')
+            self._send(HTTPStatus.UNPROCESSABLE_ENTITY, {'errors': [
+                {'field': error.field, 'message': error.message} for error in errors]})
+            return
+        try:
+            pdf = service.render(letter_from_record(record))
+        except Exception as e:
+            stats.count('errors')
+            self.log_error("rendering failed: %s", e)
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "rendering failed"})
+            return
+        if pdf is None:
+            stats.count('busy')
+            self._send(HTTPStatus.SERVICE_UNAVAILABLE, {'error': "all render slots are busy, retry later"},
+                       headers={'Retry-After': '1'})
+            return
+
+        file_name = f"{record.last_name}_{record.first_name}_tax_report_letter.pdf"
+        try:
+            self._send(HTTPStatus.OK, pdf, 'application/pdf', {'Content-Disposition': content_disposition(file_name)})
+        except Exception as e:
+            # Part of the response may already be out, so the connection is dropped instead of answered
+            stats.count('errors')
+            self.log_error("sending the letter failed: %s", e)
+            self.close_connection = True
+            return
+        stats.count('letters')
+        stats.record_latency(time.perf_counter() - start)
+
+
+def serve(host='127.0.0.1', port=8080, workers=None, max_concurrent=None, queue_timeout=DEFAULT_QUEUE_TIMEOUT):
+    """Run the letter service until interrupted (Ctrl+C).
+
+    Args:
+        host: Interface to listen on (default is localhost only).
+        port: TCP port to listen on.
+        workers: Number of render worker processes (default: CPU count).
+        max_concurrent: Maximum number of letters rendered or queued at once.
+        queue_timeout: Seconds a request waits for a render slot before a 503.
+    """
+    service = LetterService(workers, max_concurrent, queue_timeout)
+    server = ThreadingHTTPServer((host, port), LetterRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    print(f"Tax letter service listening on http://{host}:{server.server_address[1]} "
+          f"with {service.workers} worker(s). Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping tax letter service.")
+    finally:
+        server.server_close()
+        service.close()
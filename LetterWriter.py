@@ -0,0 +1,96 @@
+"""Background writing of rendered PDF letters.
+
+Rendering a letter is CPU work while saving it is I/O work that can be slow on
+network shares. LetterWriter takes the finished PDF bytes and writes them on a
+small pool of threads, so the next letter is rendered while the previous ones
+are still being written. The number of queued letters is bounded, so a slow
+disk makes submit() wait instead of letting memory grow.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from RunMetrics import get_metrics
+
+
+class LetterWriter:
+    """Write PDF bytes to disk on a bounded pool of writer threads.
+
+    Files are written to "<path>.part" and renamed when complete, so a crash
+    never leaves a truncated PDF under the final name.
+    Args:
+        threads: Number of writer threads (default is 4).
+        max_pending: Maximum number of letters queued or being written before
+            submit() blocks (default is four per thread).
+        fsync: Flush every file to stable storage before renaming it.
+    """
+
+    def __init__(self, threads=4, max_pending=None, fsync=False):
+        self.fsync = fsync
+        self.failures = []    # (path, exception) of every failed write
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='letter-writer')
+        self._slots = threading.BoundedSemaphore(max_pending or threads * 4)
+        self._lock = threading.Lock()
+        self._stats = [0, 0.0, 0.0]    # writes, total seconds, max seconds
+        self._metrics = get_metrics()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def submit(self, path, data):
+        """Queue data to be written to path, waiting while the queue is full.
+
+        Returns:
+            A Future resolving to path once the file is written.
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._write, path, data)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _write(self, path, data):
+        start = time.perf_counter()
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            partial = f"{path}.part"
+            with open(partial, 'wb') as file:
+                file.write(data)
+                if self.fsync:
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(partial, path)
+        except OSError as e:
+            with self._lock:
+                self.failures.append((path, e))
+            print(f"Error writing '{path}': {e}")
+            raise
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats[0] += 1
+            self._stats[1] += elapsed
+            self._stats[2] = max(self._stats[2], elapsed)
+        print(f"PDF '{path}' created successfully!")
+        return path
+
+    def close(self):
+        """Wait until every queued letter is written and stop the threads.
+
+        Returns:
+            list: (path, exception) for every write that failed.
+        """
+        self._executor.shutdown(wait=True)
+        if self._stats[0]:
+            self._metrics.merge({'stages': {'write': list(self._stats)}, 'counters': {}})
+        return self.failures
@@ -1,9 +1,25 @@
-from JsonInputProcessor import processJSON
+import argparse
+import os
+import sys
+import time
+
+from JsonInputProcessor import processJSON, process_file, validate_file
 from ConsoleInputProcessor import processConsoleInput
+from RecordStream import RecordIds
+from RunMetrics import enable_metrics, disable_metrics
+from ShardCoordinator import (merge_manifests, merge_run_summaries, merge_summary_exports, parse_shard,
+                              run_local_shards, shard_path, write_run_summary)
+from TaxSummaryExporter import SUMMARY_FORMATS, summary_file_name
+
+# Exit codes of the headless batch mode
+EXIT_OK = 0
+EXIT_RECORD_ERRORS = 1
+EXIT_INPUT_ERROR = 2
+
 
 def main():
     """Prompt user to choose input method and process accordingly.
-    
+
     Repeatedly prompts the user to select between JSON file input or console input
     until a valid choice is made. Then executes the appropriate processing function
     based on the user's selection.
@@ -18,5 +34,261 @@ def main():
     else:
         processConsoleInput()
 
+
+def build_parser():
+    """Build the argument parser of the headless batch mode."""
+    parser = argparse.ArgumentParser(
+        description="Calculate taxes and generate tax letters. Without arguments the interactive mode is started.")
+    parser.add_argument("--input", "-i", nargs="+", metavar="PATH",
+                        help="one or more .json, .jsonl, .csv, .parquet or .arrow files with taxpayer records")
+    parser.add_argument("--output-dir", "-o", default=".",
+                        help="root directory for generated letters (default: current directory)")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="number of worker processes used for rendering (default: 1)")
+    parser.add_argument("--writer-threads", type=int, default=0,
+                        help="render letters in memory and write them on this many background threads "
+                             "per worker, overlapping rendering with disk I/O (default: 0, write synchronously)")
+    parser.add_argument("--format", "-f", choices=["pdf", "combined", *SUMMARY_FORMATS], default="pdf",
+                        help="'pdf' writes one file per taxpayer, 'combined' one PDF per input file; "
+                             "'csv', 'jsonl' and 'sqlite' only calculate taxes and write one summary file "
+                             "per input file without rendering letters (default: pdf)")
+    parser.add_argument("--letters-per-file", type=int, default=None,
+                        help="with --format combined, start a new PDF after this many letters")
+    parser.add_argument("--manifest", metavar="PATH",
+                        help="checkpoint manifest; records already rendered according to it are skipped "
+                             "and every outcome is appended, so an interrupted run can be resumed")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="reuse letters with identical content from this cache instead of rendering them again")
+    parser.add_argument("--cache-size-mb", type=int, default=1024,
+                        help="evict least recently used letters once the cache exceeds this size (default: 1024)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="validate records and calculate taxes without writing any letters")
+    parser.add_argument("--validate-only", action="store_true",
+                        help="only validate all records (in parallel with --workers) and report every invalid one")
+    parser.add_argument("--rejects", metavar="PATH",
+                        help="validate all input files before processing them and write every invalid record "
+                             "with its field errors as JSON Lines to PATH")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="time every pipeline stage and write the metrics report as JSON to PATH")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="capture a cProfile profile of the run and write it to PATH")
+    parser.add_argument("--shard", metavar="INDEX/COUNT",
+                        help="only process the records of one shard, e.g. 0/4 on the first of four nodes; "
+                             "manifest, summary and other output files get a .shard-INDEX-of-COUNT suffix")
+    parser.add_argument("--merge-shards", type=int, metavar="COUNT",
+                        help="combine the manifests, summary exports and run summaries of COUNT finished shards")
+    parser.add_argument("--shards", type=int, metavar="COUNT",
+                        help="run COUNT shards as local processes (stand-ins for nodes) and merge their output")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="instead of processing files, run a local HTTP service on PORT that returns the "
+                             "letter of a taxpayer record POSTed as JSON to /letter (uses --workers render processes)")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="with --serve, the interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--max-concurrent", type=int, default=None,
+                        help="with --serve, the maximum number of letters rendered at once (default: 2 per worker)")
+    return parser
+
+
+def validate_inputs(args):
+    """Validate every record of all input files, writing the invalid ones to args.rejects.
+
+    Returns:
+        tuple: (valid, invalid, unreadable_files) counts.
+    """
+    valid = invalid = input_errors = 0
+    rejects_path = shard_path(args.rejects, args.shard) if args.shard else args.rejects
+    rejects_file = None
+    if rejects_path:
+        try:
+            if os.path.dirname(rejects_path):
+                os.makedirs(os.path.dirname(rejects_path), exist_ok=True)
+            rejects_file = open(rejects_path, "w", encoding="utf-8")
+        except OSError as e:
+            print(f"Error: could not write rejects to {rejects_path}: {e}", file=sys.stderr)
+            return 0, 0, len(args.input)
+    # A record ID may only be used once across all input files
+    seen_ids = RecordIds()
+    try:
+        for path in args.input:
+            try:
+                summary = validate_file(path, rejects_file, args.workers, shard=args.shard, seen_ids=seen_ids)
+            except (OSError, ValueError) as e:
+                input_errors += 1
+                print(f"Error: could not validate {path}: {e}", file=sys.stderr)
+                continue
+            valid += summary.succeeded
+            invalid += summary.failed
+    finally:
+        seen_ids.close()
+        if rejects_file is not None:
+            rejects_file.close()
+    if args.rejects:
+        print(f"Validation: {valid} valid, {invalid} invalid record(s); rejects written to {rejects_path}.")
+    return valid, invalid, input_errors
+
+
+def run_batch(args):
+    """Process all input files of a parsed command line and print a run summary.
+
+    Args:
+        args: The namespace returned by build_parser().parse_args().
+    Returns:
+        int: EXIT_OK if every record was processed, EXIT_RECORD_ERRORS if some
+            records were rejected and EXIT_INPUT_ERROR if an input file could
+            not be read.
+    """
+    succeeded = failed = skipped = 0
+    input_errors = 0
+    metrics = enable_metrics(profile=bool(args.profile)) if args.metrics or args.profile else None
+    start = time.perf_counter()
+
+    inputs = args.input
+    if args.validate_only or args.rejects:
+        # Unreadable files are reported again (and counted) when they are processed
+        valid, invalid, unreadable = validate_inputs(args)
+        if args.validate_only:
+            succeeded, failed, input_errors = valid, invalid, unreadable
+            inputs = []
+
+    # Every shard writes its own manifest, summary and combined files
+    per_run = (lambda path: shard_path(path, args.shard)) if args.shard else (lambda path: path)
+    # A record ID may only be used once across all input files, else letters would overwrite each other
+    with RecordIds() as seen_ids:
+        for path in inputs:
+            combined_file = summary_file = None
+            if args.format == "combined":
+                stem = os.path.splitext(os.path.basename(path))[0]
+                combined_file = per_run(os.path.join(args.output_dir, f"{stem}_letters.pdf"))
+            elif args.format in SUMMARY_FORMATS:
+                summary_file = per_run(summary_file_name(path, args.output_dir, args.format))
+            try:
+                summary = process_file(path, args.workers, combined_file, args.letters_per_file,
+                                       args.output_dir, args.dry_run, args.writer_threads, per_run(args.manifest),
+                                       args.cache_dir, args.cache_size_mb * 1024 * 1024,
+                                       summary_file, args.format, args.shard, seen_ids)
+            except (OSError, ValueError) as e:
+                input_errors += 1
+                print(f"Error: could not process {path}: {e}", file=sys.stderr)
+                continue
+            succeeded += summary.succeeded
+            failed += summary.failed
+            skipped += summary.skipped
+
+    elapsed = time.perf_counter() - start
+    if metrics is not None:
+        disable_metrics()
+        print(metrics.format_report())
+        if args.metrics:
+            metrics.write_json(per_run(args.metrics))
+        if args.profile:
+            metrics.write_profile(per_run(args.profile))
+    total = succeeded + failed + skipped
+    rate = total / elapsed if elapsed > 0 else 0.0
+    if args.dry_run or args.validate_only:
+        action = "validated"
+    elif args.format in SUMMARY_FORMATS:
+        action = "exported"
+    else:
+        action = "letters created"
+    print(f"Run summary: {len(args.input)} file(s), {total} records, {succeeded} {action}, {failed} failed, "
+          f"{skipped} unchanged, {input_errors} unreadable file(s) in {elapsed:.2f}s ({rate:,.1f} records/sec)")
+    if args.shard:
+        write_run_summary(args.output_dir, args.shard, files=len(args.input), succeeded=succeeded, failed=failed,
+                          skipped=skipped, input_errors=input_errors, seconds=elapsed)
+
+    if input_errors:
+        return EXIT_INPUT_ERROR
+    if failed:
+        return EXIT_RECORD_ERRORS
+    return EXIT_OK
+
+
+def merge_shards(args):
+    """Combine the output of args.merge_shards finished shards and print the combined run summary.
+
+    Returns:
+        int: The exit code for the combined run, as returned by run_batch.
+    """
+    shard_count = args.merge_shards
+    try:
+        if args.format in SUMMARY_FORMATS:
+            for path in args.input or []:
+                summary_file = summary_file_name(path, args.output_dir, args.format)
+                merged = merge_summary_exports(summary_file, args.format, shard_count)
+                print(f"Summary '{summary_file}' merged from {shard_count} shards with {merged} records.")
+        # Only per-letter runs write a manifest
+        if args.manifest and args.format == "pdf" and not (args.dry_run or args.validate_only):
+            rendered = merge_manifests(args.manifest, shard_count)
+            print(f"Manifest '{args.manifest}' merged from {shard_count} shards ({rendered} letters).")
+        totals = merge_run_summaries(args.output_dir, shard_count)
+    except (OSError, ValueError) as e:
+        print(f"Error: could not merge shards: {e}", file=sys.stderr)
+        return EXIT_INPUT_ERROR
+
+    total = totals["succeeded"] + totals["failed"] + totals["skipped"]
+    print(f"Merged run summary: {shard_count} shard(s), {totals['files']} file(s), {total} records, "
+          f"{totals['succeeded']} succeeded, {totals['failed']} failed, {totals['skipped']} unchanged, "
+          f"{totals['input_errors']} unreadable file(s); slowest shard {totals['seconds']:.2f}s")
+    if totals["input_errors"]:
+        return EXIT_INPUT_ERROR
+    if totals["failed"]:
+        return EXIT_RECORD_ERRORS
+    return EXIT_OK
+
+
+def _without_option(argv, option):
+    """Return argv without option and its value (given as "--option VALUE" or "--option=VALUE")."""
+    result = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == option:
+            skip = True
+        elif not arg.startswith(option + "="):
+            result.append(arg)
+    return result
+
+
+def cli(argv=None):
+    """Run the headless batch mode when arguments are given, else the interactive mode."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        main()
+        return EXIT_OK
+    args = build_parser().parse_args(argv)
+    if args.workers < 1:
+        print("Error: --workers must be at least 1.", file=sys.stderr)
+        return EXIT_INPUT_ERROR
+    if args.writer_threads < 0:
+        print("Error: --writer-threads must not be negative.", file=sys.stderr)
+        return EXIT_INPUT_ERROR
+    if args.serve is not None:
+        # Imported here so batch runs do not load the HTTP server modules
+        from LetterService import serve
+        serve(args.host, args.serve, args.workers, args.max_concurrent)
+        return EXIT_OK
+    if args.shard:
+        try:
+            args.shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return EXIT_INPUT_ERROR
+    for option in ("letters_per_file", "merge_shards", "shards"):
+        if getattr(args, option) is not None and getattr(args, option) < 1:
+            print(f"Error: --{option.replace('_', '-')} must be at least 1.", file=sys.stderr)
+            return EXIT_INPUT_ERROR
+    if args.merge_shards and not args.shards:
+        return merge_shards(args)
+    if not args.input:
+        print("Error: --input is required unless --serve or --merge-shards is given.", file=sys.stderr)
+        return EXIT_INPUT_ERROR
+    if args.shards:
+        exit_codes = run_local_shards(_without_option(argv, "--shards"), args.shards, args.output_dir)
+        args.merge_shards = args.shards
+        return max(exit_codes + [merge_shards(args)])
+    return run_batch(args)
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(cli())
@@ -0,0 +1,237 @@
+"""Streaming of input records and their stable identifiers.
+
+Both the letter pipeline (JsonInputProcessor) and the compute-only export
+(TaxSummaryExporter) read records through this module, so it must not import
+either of them.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from typing import NamedTuple
+
+from RecordValidator import FieldError
+
+# Matches the whitespace at a position, so the next token is found without copying the buffer
+_skip_whitespace = re.compile(r'\s*').match
+
+
+# Yields the elements of a top-level JSON array one at a time without loading the whole file
+def iter_json_array(file, chunk_size=65536):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = file.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def next_token():
+        nonlocal pos
+        while True:
+            pos = _skip_whitespace(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return buffer[pos] if pos < len(buffer) else ''
+            read_more()
+
+    # Only whitespace may follow the closing ']', else the file is not a single JSON array
+    def expect_end():
+        nonlocal pos
+        pos += 1
+        token = next_token()
+        if token:
+            raise ValueError(f"Expected end of file after the closing ']', found {token!r}.")
+
+    token = next_token()
+    if token != '[':
+        raise ValueError(f"Expected a JSON array of person records, but file starts with {token or 'nothing'!r}.")
+    pos += 1
+    if next_token() == ']':
+        expect_end()
+        return
+
+    while True:
+        try:
+            element, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            read_more()
+            continue
+        # A number cut at the buffer edge (e.g. "1." of "1.5") decodes early, so only accept
+        # an element once the following ',' or ']' is already in the buffer
+        following = _skip_whitespace(buffer, end).end()
+        if not eof and buffer[following:following + 1] not in (',', ']'):
+            read_more()
+            continue
+        pos = end
+        yield element
+
+        token = next_token()
+        if token == ']':
+            expect_end()
+            return
+        if token != ',':
+            raise ValueError(f"Expected ',' or ']' between records, found {token or 'end of file'!r}.")
+        pos += 1
+        next_token()
+
+
+# Yields one record per non-empty line of a JSON Lines file
+def iter_json_lines(file):
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+
+
+def stream_json_records(path):
+    """Yield person records from a JSON array or JSON Lines file one at a time.
+
+    Files ending in .jsonl are read line by line; anything else must hold a
+    top-level JSON array, which is parsed incrementally element by element.
+    Memory use therefore stays flat regardless of file size.
+    Args:
+        path (str): Path to the .json or .jsonl file.
+    Yields:
+        dict: One person record per element or line.
+    Raises:
+        OSError: If the file cannot be opened or read.
+        ValueError: If the content is not valid JSON or not an array.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        if path.lower().endswith('.jsonl'):
+            yield from iter_json_lines(file)
+        else:
+            yield from iter_json_array(file)
+
+
+# Prefix of the ID given to a record without "id" field, so it never equals a plain numeric ID like "00000003"
+POSITIONAL_ID_PREFIX = "row-"
+
+
+def positional_prefix(path):
+    """Return the prefix of the positional record IDs of an input file, e.g. "jan-row-" for "data/jan.jsonl".
+
+    The file name keeps the records without "id" field of the different input
+    files of one run apart, so they do not get the same letter file.
+    """
+    return f"{os.path.splitext(os.path.basename(path))[0]}-{POSITIONAL_ID_PREFIX}"
+
+
+# Returns the record ID of an "id" value: the value itself, else one derived from the position in the input
+def make_record_id(value, index, prefix=POSITIONAL_ID_PREFIX):
+    return str(value) if value not in (None, '') else f"{prefix}{index:08d}"
+
+
+# Returns the stable identifier used to name a record's letter: its "id" field, else its position in the input
+def record_id(person, index, prefix=POSITIONAL_ID_PREFIX):
+    return make_record_id(person.get('id') if isinstance(person, dict) else None, index, prefix)
+
+
+class IdentifiedRecord(NamedTuple):
+    """An input record together with its record ID."""
+    record_id: str
+    record: object
+
+
+def identify_records(records, path=None, shard=None):
+    """Yield (index, IdentifiedRecord) for the records of an input file.
+
+    Args:
+        records (iterable): The records in input order, e.g. from stream_json_records.
+        path (str): The input file; its name starts the positional record IDs.
+        shard (tuple): Only yield the records of (shard_index, shard_count), see shard_of.
+    """
+    prefix = positional_prefix(path) if path else POSITIONAL_ID_PREFIX
+    for index, person in enumerate(records):
+        rid = record_id(person, index, prefix)
+        if not shard or shard_of(rid, shard[1]) == shard[0]:
+            yield index, IdentifiedRecord(rid, person)
+
+
+class RecordIds:
+    """The record IDs seen so far in a run, to detect records sharing an ID.
+
+    Two records with the same ID would get the same letter file (and the same
+    summary row), also when they come from different input files of the run,
+    so every record after the first one is rejected instead. The IDs are kept
+    in a temporary SQLite database on disk rather than in memory, so memory
+    use stays flat however many records a run reads.
+    """
+
+    def __init__(self):
+        # An empty file name gives a private temporary database that SQLite deletes on close
+        self._connection = sqlite3.connect('')
+        self._connection.execute("CREATE TABLE record_ids (id TEXT PRIMARY KEY, serial INTEGER, source INTEGER, "
+                                 "position INTEGER) WITHOUT ROWID")
+        self._sources = {}    # input file -> number stored in the source column
+        self._serial = 0      # number of IDs registered so far
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def duplicates(self, indexed_ids, path=None):
+        """Register the IDs of records of one input file.
+
+        Args:
+            indexed_ids (iterable): (index, record_id) pairs of the records.
+            path (str): The input file of the records.
+        Returns:
+            dict: {index: FieldError} for every record whose ID an earlier
+                record of the run (or of indexed_ids) already uses.
+        """
+        source = self._sources.setdefault(path, len(self._sources))
+        serial = self._serial
+        rows = [(rid, serial + offset, source, index) for offset, (index, rid) in enumerate(indexed_ids)]
+        self._serial += len(rows)
+        connection = self._connection
+        before = connection.total_changes
+        connection.executemany("INSERT OR IGNORE INTO record_ids VALUES (?, ?, ?, ?)", rows)
+        if connection.total_changes - before == len(rows):
+            return {}
+
+        # Some IDs were taken already: every row whose stored serial is not its own is a duplicate
+        errors = {}
+        for start in range(0, len(rows), 500):
+            part = rows[start:start + 500]
+            query = (f"SELECT id, serial, source, position FROM record_ids "
+                     f"WHERE id IN ({', '.join('?' * len(part))})")
+            first = {row[0]: row[1:] for row in connection.execute(query, [row[0] for row in part])}
+            for rid, row_serial, _, index in part:
+                first_serial, first_source, first_index = first[rid]
+                if first_serial != row_serial:
+                    errors[index] = self._error(rid, first_index, first_source, source)
+        return errors
+
+    def _error(self, rid, first_index, first_source, source):
+        where = f"record {first_index}"
+        if first_source != source:
+            where += f" of {next(path for path, number in self._sources.items() if number == first_source)}"
+        return FieldError('id', f"is already used by {where}", rid)
+
+    def close(self):
+        self._connection.close()
+
+
+def shard_of(rid, shard_count):
+    """Return the shard (0 to shard_count - 1) a record ID belongs to.
+
+    The partition only depends on the record ID, so every node that reads the
+    same input assigns each record to the same shard.
+    """
+    return int.from_bytes(hashlib.sha256(str(rid).encode('utf-8')).digest()[:8], 'big') % shard_count
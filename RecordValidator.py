@@ -0,0 +1,196 @@
+"""Compiled validation of taxpayer records.
+
+A RecordValidator is built once from a schema describing every field. It then
+checks and coerces a record in a single pass and returns structured
+FieldError objects instead of printing, so callers decide how to report them.
+The same rules apply to every input path: JSON and columnar files, the
+console prompts (field by field through check_field) and the letter service.
+"""
+
+import math
+import re
+from collections import namedtuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Letters of any script (including accented ones), words separated by one space, apostrophe or hyphen
+NAME_PATTERN = r"[^\W\d_]+(?:[ '\-][^\W\d_]+)*"
+# Swiss address: street name, house number (optionally with a letter), 4-digit zip code and city
+ADDRESS_PATTERN = (r"[^\W\d_]+(?:[ '\-\.][^\W\d_]+)*\s+\d+[A-Za-z]?\s+\d{4}\s+"
+                   r"[^\W\d_]+(?:[ '\-][^\W\d_]+)*")
+# Accepted spellings of sex, normalized to the 'M'/'F' used by the letters
+SEX_VALUES = {'m': 'M', 'male': 'M', 'man': 'M', 'f': 'F', 'female': 'F', 'woman': 'F'}
+
+# Schema of a taxpayer record. Field types:
+#   name   - non-empty string matching the name pattern
+#   text   - non-empty string, optionally matching "pattern"
+#   sex    - one of SEX_VALUES (case-insensitive), normalized to 'M' or 'F'
+#   number - finite float, optionally bounded below by "min"
+JSON_SCHEMA = {
+    'first_name': {'type': 'name'},
+    'last_name': {'type': 'name'},
+    'sex': {'type': 'sex'},
+    'address': {'type': 'text', 'pattern': ADDRESS_PATTERN,
+                'message': "must be a Swiss address: street name, street number, 4-digit zip code and city "
+                           "(e.g. 'General Weberstrasse 12 8001 Zürich')"},
+    'gross_salary': {'type': 'number', 'min': 0},
+    'social_deduction': {'type': 'number', 'min': 0},
+    'expenses': {'type': 'number', 'min': 0},
+}
+
+
+class TaxRecord(NamedTuple):
+    """A validated taxpayer record with stripped strings and float amounts."""
+    first_name: str
+    last_name: str
+    sex: str
+    address: str
+    gross_salary: float
+    social_deduction: float
+    expenses: float
+
+
+class FieldError(NamedTuple):
+    """A single validation failure of one field of a record."""
+    field: str
+    message: str
+    value: object = None
+
+    def __str__(self):
+        return f"{self.field}: {self.message} (got {self.value!r})"
+
+
+def _missing(value):
+    return value is None or (isinstance(value, str) and value.strip() == "")
+
+
+def _compile_field(field, spec):
+    """Return a check(value) -> (coerced_value, error_message) function for one field."""
+    field_type = spec['type']
+
+    if field_type == 'number':
+        minimum = spec.get('min')
+
+        def check(value):
+            if _missing(value) or isinstance(value, bool):
+                return None, "is missing or not a number"
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                return None, "must be a number"
+            if not math.isfinite(number):
+                return None, "must be a finite number"
+            if minimum is not None and number < minimum:
+                return None, f"must be at least {minimum}"
+            return number, None
+        return check
+
+    if field_type == 'sex':
+        def check(value):
+            if _missing(value):
+                return None, "is missing or empty"
+            normalized = SEX_VALUES.get(str(value).strip().lower())
+            if normalized is None:
+                return None, "must be one of: male, female, man, woman, m, f"
+            return normalized, None
+        return check
+
+    if field_type == 'name':
+        fullmatch = re.compile(spec.get('pattern', NAME_PATTERN)).fullmatch
+        message = spec.get('message', "must contain only letters (including accented), separated by single "
+                                      "spaces, apostrophes or hyphens")
+    elif field_type == 'text':
+        fullmatch = re.compile(spec['pattern']).fullmatch if 'pattern' in spec else None
+        message = spec.get('message', "has an invalid format")
+    else:
+        raise ValueError(f"Unknown type {field_type!r} for field {field!r} in validation schema.")
+
+    def check(value):
+        if _missing(value):
+            return None, "is missing or empty"
+        text = str(value).strip()
+        if fullmatch is not None and not fullmatch(text):
+            return None, message
+        return text, None
+    return check
+
+
+class RecordValidator:
+    """Validate and coerce taxpayer records against a precompiled schema.
+
+    Args:
+        schema: Mapping of field name to field spec (default is JSON_SCHEMA).
+            Regular expressions are compiled once here, not per record.
+            Valid records are returned as TaxRecord when the schema has its
+            fields, otherwise as a named tuple of the schema's fields.
+    """
+
+    def __init__(self, schema: Optional[Dict[str, Dict]] = None):
+        self.schema = dict(schema or JSON_SCHEMA)
+        if tuple(self.schema) == TaxRecord._fields:
+            self.record_type = TaxRecord
+        else:
+            self.record_type = namedtuple('ValidatedRecord', self.schema)
+        self._checks = tuple((field, _compile_field(field, spec)) for field, spec in self.schema.items())
+        self._checks_by_field = dict(self._checks)
+
+    def check_field(self, field, value) -> Tuple[object, Optional[FieldError]]:
+        """Validate and coerce a single field, e.g. while it is typed in.
+
+        Returns:
+            A tuple (coerced_value, error); error is None if the value is valid.
+        """
+        coerced, message = self._checks_by_field[field](value)
+        return (coerced, None) if message is None else (None, FieldError(field, message, value))
+
+    def validate(self, record) -> Tuple[Optional[TaxRecord], List[FieldError]]:
+        """Validate one record and coerce its values in a single pass.
+
+        Args:
+            record: The record dictionary to validate.
+        Returns:
+            A tuple (clean_record, errors). clean_record is a TaxRecord holding
+            the schema fields with stripped strings and float numbers, or None
+            when errors is not empty.
+        """
+        if not isinstance(record, dict):
+            return None, [FieldError('record', "must be a JSON object", type(record).__name__)]
+        values = []
+        errors = []
+        for field, check in self._checks:
+            value = record.get(field)
+            coerced, message = check(value)
+            if message is None:
+                values.append(coerced)
+            else:
+                errors.append(FieldError(field, message, value))
+        return (None, errors) if errors else (self.record_type._make(values), errors)
+
+    def validate_columns(self, columns: Dict[str, List], row_count: int) -> Tuple[Dict[str, List], Dict[int, List[FieldError]]]:
+        """Validate a column-oriented batch one field at a time.
+
+        Args:
+            columns: Mapping of field name to a sequence of row_count values.
+            row_count: The number of rows in the batch.
+        Returns:
+            A tuple (clean_columns, errors). clean_columns maps every schema
+            field to its coerced values (None for rejected values); errors
+            maps the row index of every invalid row to its FieldErrors.
+        """
+        clean = {}
+        errors: Dict[int, List[FieldError]] = {}
+        for field, check in self._checks:
+            column = columns.get(field)
+            if column is None:
+                column = [None] * row_count
+            values = [None] * row_count
+            for row, value in enumerate(column):
+                coerced, message = check(value)
+                if message is None:
+                    values[row] = coerced
+                else:
+                    errors.setdefault(row, []).append(FieldError(field, message, value))
+            clean[field] = values
+        return clean, errors
+
+
+DEFAULT_VALIDATOR = RecordValidator()
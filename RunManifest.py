@@ -0,0 +1,96 @@
+"""Checkpoint manifest for resumable batch runs.
+
+The manifest is a JSON Lines file with one entry per processed record:
+
+    {"hash": "...", "record_id": "R000000001", "file": "out/9b/6f/...pdf", "status": "ok"}
+
+Entries are appended and flushed while the batch runs, so after a crash the
+manifest lists every letter finished so far. A later entry for the same hash
+replaces an earlier one, e.g. when a queued letter could not be written. A
+rerun with the same manifest skips records whose hash is listed as "ok" and
+whose letter still exists, and only processes new, modified or previously
+failed records. The hash also covers the output directory and the letter
+layout version, so a run into another directory or with a changed layout
+renders every letter again.
+"""
+
+import hashlib
+import json
+import os
+
+
+class RunManifest:
+    """Append-only record of rendered letters, keyed by record content hash.
+
+    Args:
+        path: The manifest file. Existing entries are loaded, new ones appended.
+        fsync: Force every entry to stable storage (slower, survives power loss).
+    """
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.entries = {}    # hash -> output file of records rendered successfully
+        if os.path.exists(path):
+            self._load()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    @staticmethod
+    def record_hash(person, record_id, output_dir=None, layout_version=None):
+        """Return a stable hash of a record's ID and content (independent of key order).
+
+        Values JSON has no type for, such as the dates, timestamps and decimals
+        of Parquet/Arrow columns, are hashed by their string form.
+        Args:
+            person: The record as read from the input.
+            record_id (str): The record ID its letter is named after.
+            output_dir (str): Root directory of the letter tree (default: current directory).
+            layout_version: The letter layout version (TaxPrinter.LETTER_LAYOUT_VERSION).
+        """
+        canonical = json.dumps(person, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+        target = os.path.abspath(output_dir or '.')
+        return hashlib.sha256(f"{record_id}\n{target}\n{layout_version}\n{canonical}".encode('utf-8')).hexdigest()
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue    # a line cut short by a crash
+                if entry.get('status') == 'ok':
+                    self.entries[entry['hash']] = entry['file']
+                else:
+                    self.entries.pop(entry.get('hash'), None)
+
+    def is_done(self, digest):
+        """Return True if the record was rendered before and its letter still exists."""
+        file_name = self.entries.get(digest)
+        return file_name is not None and os.path.exists(file_name)
+
+    def record(self, digest, record_id, file_name, error=None):
+        """Append the outcome of one record; error is None for a rendered letter."""
+        entry = {'hash': digest, 'record_id': record_id, 'file': file_name,
+                 'status': 'failed' if error else 'ok'}
+        if error:
+            entry['error'] = error
+            self.entries.pop(digest, None)
+        else:
+            self.entries[digest] = file_name
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,179 @@
+"""Per-stage timers and counters for batch runs.
+
+Pipeline code reports its work through the active metrics object:
+
+    with get_metrics().stage('validate'):
+        ...
+    get_metrics().count('records_failed')
+
+By default the active object is NULL_METRICS, whose methods do nothing, so
+instrumented code costs only a method call when metrics are disabled. Call
+enable_metrics() to collect timings, optionally with a cProfile capture of
+the whole run, and write them as a JSON report at the end.
+"""
+
+import cProfile
+import json
+import time
+from contextlib import nullcontext
+
+
+class _StageTimer:
+    """Context manager adding the elapsed time of its block to one stage."""
+
+    __slots__ = ('_stats', '_start')
+
+    def __init__(self, stats):
+        self._stats = stats
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._start
+        stats = self._stats
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+        return False
+
+
+class RunMetrics:
+    """Collect per-stage timings and counters of one run.
+
+    Args:
+        profile: Also capture a cProfile profile while the metrics are active.
+    """
+
+    enabled = True
+
+    def __init__(self, profile=False):
+        self.stages = {}      # stage name -> [calls, total seconds, max seconds]
+        self.counters = {}
+        self.started = time.perf_counter()
+        self.profiler = cProfile.Profile() if profile else None
+
+    def stage(self, name):
+        """Return a context manager that times one execution of the named stage."""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = [0, 0.0, 0.0]
+        return _StageTimer(stats)
+
+    def timed_iter(self, name, iterable):
+        """Yield from iterable, timing every step as the named stage (e.g. parsing input)."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name, amount=1):
+        """Increase the named counter by amount."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """Return the collected stages and counters as plain data (e.g. to send from a worker)."""
+        return {'stages': {name: list(stats) for name, stats in self.stages.items()},
+                'counters': dict(self.counters)}
+
+    def merge(self, snapshot):
+        """Add the stages and counters of a snapshot taken in another process."""
+        for name, (calls, total, longest) in snapshot['stages'].items():
+            stats = self.stages.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += calls
+            stats[1] += total
+            stats[2] = max(stats[2], longest)
+        for name, amount in snapshot['counters'].items():
+            self.count(name, amount)
+
+    def report(self):
+        """Return the metrics as a JSON-serializable dictionary."""
+        return {
+            'wall_seconds': time.perf_counter() - self.started,
+            'stages': {
+                name: {
+                    'calls': calls,
+                    'total_seconds': total,
+                    'mean_ms': total / calls * 1000 if calls else 0.0,
+                    'max_ms': longest * 1000,
+                }
+                for name, (calls, total, longest) in self.stages.items()
+            },
+            'counters': dict(self.counters),
+        }
+
+    def format_report(self):
+        """Return a human readable table of the stage timings and counters."""
+        report = self.report()
+        lines = [f"Run metrics ({report['wall_seconds']:.2f}s wall time)",
+                 f"{'stage':<16}{'calls':>10}{'total s':>10}{'mean ms':>10}{'max ms':>10}"]
+        for name, stats in report['stages'].items():
+            lines.append(f"{name:<16}{stats['calls']:>10}{stats['total_seconds']:>10.3f}"
+                         f"{stats['mean_ms']:>10.3f}{stats['max_ms']:>10.3f}")
+        for name, amount in report['counters'].items():
+            lines.append(f"{name}: {amount}")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        """Write the metrics report as JSON to path."""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, indent=2)
+
+    def write_profile(self, path):
+        """Write the captured cProfile statistics to path (readable with pstats)."""
+        if self.profiler is not None:
+            self.profiler.dump_stats(path)
+
+
+class _NullMetrics:
+    """Stand-in used while metrics are disabled; every method is a no-op."""
+
+    enabled = False
+    _context = nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+    def timed_iter(self, name, iterable):
+        return iterable
+
+    def count(self, name, amount=1):
+        pass
+
+    def merge(self, snapshot):
+        pass
+
+
+NULL_METRICS = _NullMetrics()
+_active = NULL_METRICS
+
+
+def get_metrics():
+    """Return the active metrics object (NULL_METRICS while disabled)."""
+    return _active
+
+
+def enable_metrics(profile=False):
+    """Start collecting metrics in this process and return the new RunMetrics."""
+    global _active
+    disable_metrics()
+    _active = RunMetrics(profile)
+    if _active.profiler is not None:
+        _active.profiler.enable()
+    return _active
+
+
+def disable_metrics():
+    """Stop collecting metrics and return the RunMetrics that was active, if any."""
+    global _active
+    metrics = _active
+    if metrics.enabled and metrics.profiler is not None:
+        metrics.profiler.disable()
+    _active = NULL_METRICS
+    return metrics if metrics.enabled else None
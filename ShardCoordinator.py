@@ -0,0 +1,143 @@
+"""Sharded batch runs across several nodes.
+
+For year-end runs the records are split into N shards. Every node runs the
+same command with "--shard i/N" (0 <= i < N) on the same input files and a
+shared output directory. RecordStream.shard_of assigns each record to
+exactly one shard by hashing its record ID, so no coordination between the
+nodes is needed. Files that are written per run (checkpoint manifest, summary
+export, combined PDF, rejects, metrics and the run summary) get a
+".shard-i-of-N" suffix, so nodes never write the same file.
+
+When all shards are done, "--merge-shards N" combines the shard manifests,
+summary exports and run summaries. run_local_shards() starts N processes on
+this machine as stand-ins for nodes, e.g. to try a sharded run locally.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from RunManifest import RunManifest
+from TaxSummaryExporter import merge_summaries
+
+RUN_SUMMARY_NAME = "run_summary.json"
+SUMMARY_COUNTS = ('files', 'succeeded', 'failed', 'skipped', 'input_errors')
+
+
+def parse_shard(text):
+    """Parse "i/N" into (i, N), raising ValueError unless 0 <= i < N."""
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard {text!r}; expected INDEX/COUNT, e.g. 0/4.") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {text!r}; the index must be between 0 and COUNT - 1.")
+    return index, count
+
+
+def shard_path(path, shard):
+    """Return the per-shard name of a file, e.g. "manifest.shard-0001-of-0004.jsonl"."""
+    if path is None:
+        return None
+    index, count = shard
+    base, extension = os.path.splitext(path)
+    return f"{base}.shard-{index:04d}-of-{count:04d}{extension}"
+
+
+def shard_paths(path, shard_count):
+    """Return the per-shard names of a file for every shard, in shard order."""
+    return [shard_path(path, (index, shard_count)) for index in range(shard_count)]
+
+
+def write_run_summary(output_dir, shard, **counts):
+    """Write the record counts of one shard's run for merge_run_summaries."""
+    path = shard_path(os.path.join(output_dir, RUN_SUMMARY_NAME), shard)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'shard': list(shard), **counts}, file, indent=2)
+    return path
+
+
+def _require(paths):
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"Missing shard output (did every shard finish?): {', '.join(missing)}")
+
+
+def merge_run_summaries(output_dir, shard_count):
+    """Add up the run summaries of all shards and write the totals to output_dir.
+
+    Returns:
+        dict: The summed counts; 'seconds' is the slowest shard's run time.
+    Raises:
+        FileNotFoundError: If a shard has not written its run summary.
+    """
+    target = os.path.join(output_dir, RUN_SUMMARY_NAME)
+    paths = shard_paths(target, shard_count)
+    _require(paths)
+    totals = dict.fromkeys(SUMMARY_COUNTS, 0)
+    totals['seconds'] = 0.0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            summary = json.load(file)
+        for name in SUMMARY_COUNTS:
+            totals[name] += summary.get(name, 0)
+        totals['seconds'] = max(totals['seconds'], summary.get('seconds', 0.0))
+    totals['files'] //= shard_count    # every shard reads the same input files
+    with open(target, 'w', encoding='utf-8') as file:
+        json.dump({'shards': shard_count, **totals}, file, indent=2)
+    return totals
+
+
+def merge_manifests(manifest_path, shard_count):
+    """Combine the shard manifests into manifest_path (replaced if it exists).
+
+    The shard manifests are kept, so every shard can still be resumed on its own.
+    Returns:
+        int: Number of records rendered successfully according to the combined manifest.
+    """
+    paths = shard_paths(manifest_path, shard_count)
+    _require(paths)
+    partial = f"{manifest_path}.part"
+    with open(partial, 'w', encoding='utf-8') as target:
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    if line.endswith('\n'):    # skip a last line cut short by a crash
+                        target.write(line)
+    os.replace(partial, manifest_path)
+    with RunManifest(manifest_path) as manifest:
+        return len(manifest.entries)
+
+
+def merge_summary_exports(summary_file, fmt, shard_count):
+    """Combine the summary exports of all shards into summary_file.
+
+    Returns:
+        int: Number of records in the combined summary.
+    """
+    paths = shard_paths(summary_file, shard_count)
+    _require(paths)
+    return merge_summaries(paths, summary_file, fmt)
+
+
+def run_local_shards(argv, shard_count, log_dir="."):
+    """Run one process per shard on this machine and wait for all of them.
+
+    Every process runs Main.py with argv plus "--shard i/N". Its output goes
+    to "<log_dir>/run.shard-i-of-N.log".
+    Returns:
+        list: The exit code of every shard, in shard order.
+    """
+    main_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Main.py")
+    os.makedirs(log_dir, exist_ok=True)
+    processes = []
+    for index in range(shard_count):
+        log_path = shard_path(os.path.join(log_dir, "run.log"), (index, shard_count))
+        with open(log_path, 'w', encoding='utf-8') as log:
+            command = [sys.executable, main_script, *argv, "--shard", f"{index}/{shard_count}"]
+            processes.append(subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT))
+        print(f"Started shard {index}/{shard_count} (pid {processes[-1].pid}), log: {log_path}")
+    return [process.wait() for process in processes]
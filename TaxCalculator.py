@@ -1,4 +1,154 @@
-def calculate_tax(net_salary):
+import json
+import sys
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from typing import NamedTuple
+
+# NumPy is optional and slow to import, so get_numpy() loads it on the first batch
+# calculation; without it batches fall back to array.array
+_numpy = None
+
+
+def get_numpy():
+    """Return the numpy module, or None if it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+class TaxResult(NamedTuple):
+    """Tax owed on a net salary and the rate in percent that was applied."""
+    tax: float
+    percentage: float
+
+
+# Shared result for every salary below the first threshold
+NO_TAX = TaxResult(0, 0)
+
+
+class TaxSchedule:
+    """Progressive tax schedule compiled into an immutable bracket table.
+
+    The rate of the highest bracket whose threshold the net salary exceeds is
+    applied to the whole net salary. Lookups are a single bisect over the
+    sorted thresholds, so the cost does not depend on the number of brackets.
+    Args:
+        thresholds: Strictly increasing bracket thresholds.
+        rates: The rate in percent for each threshold.
+        cache_size: If given, memoize up to this many salary values with an
+            LRU cache (useful when many records share the same salary).
+    """
+
+    __slots__ = ('_thresholds', '_rates', '_lookup')
+
+    def __init__(self, thresholds, rates, cache_size=None):
+        thresholds = tuple(thresholds)
+        rates = tuple(rates)
+        if not thresholds or len(thresholds) != len(rates):
+            raise ValueError("A tax schedule needs one rate per threshold and at least one bracket.")
+        if any(low >= high for low, high in zip(thresholds, thresholds[1:])):
+            raise ValueError("Tax schedule thresholds must be strictly increasing.")
+        self._thresholds = thresholds
+        self._rates = rates
+        self._lookup = lru_cache(maxsize=cache_size)(self._compute) if cache_size else self._compute
+
+    @classmethod
+    def progressive(cls, start=24000, step=8000, first_rate=4, rate_step=2, rate_limit=32, cache_size=None):
+        """Build a schedule whose rate grows by rate_step every step above start, staying below rate_limit."""
+        count = len(range(first_rate, rate_limit, rate_step))
+        thresholds = [start + step * i for i in range(count)]
+        rates = [first_rate + rate_step * i for i in range(count)]
+        return cls(thresholds, rates, cache_size)
+
+    @classmethod
+    def from_dict(cls, config, cache_size=None):
+        """Build a schedule from a config mapping.
+
+        The mapping either lists explicit brackets, e.g.
+        {"brackets": [[24000, 4], [32000, 6]]}, or holds keyword arguments for
+        progressive(), e.g. {"start": 24000, "step": 8000, "first_rate": 4}.
+        """
+        if 'brackets' in config:
+            brackets = sorted(config['brackets'])
+            return cls([b[0] for b in brackets], [b[1] for b in brackets], cache_size)
+        return cls.progressive(cache_size=cache_size, **config)
+
+    @classmethod
+    def from_json(cls, path, cache_size=None):
+        """Load a schedule from a JSON file in the format accepted by from_dict."""
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls.from_dict(json.load(file), cache_size)
+
+    @property
+    def thresholds(self):
+        return self._thresholds
+
+    @property
+    def rates(self):
+        return self._rates
+
+    def __repr__(self):
+        return f"TaxSchedule(thresholds={self._thresholds!r}, rates={self._rates!r})"
+
+    def _compute(self, net_salary):
+        if net_salary > self._thresholds[0]:
+            rate = self._rates[bisect_left(self._thresholds, net_salary) - 1]
+            return TaxResult((net_salary * rate) / 100, round(rate, 1))
+        return NO_TAX
+
+    def rate_for(self, net_salary):
+        """Return the rate in percent applied to net_salary (0 below the first threshold)."""
+        return self._lookup(net_salary)[1]
+
+    def calculate(self, net_salary):
+        """Return the TaxResult for net_salary, like calculate_tax."""
+        return self._lookup(net_salary)
+
+    def calculate_batch(self, net_salaries):
+        """Calculate income tax for many net salaries in one pass.
+
+        Results are identical to calling calculate() on each value.
+        Args:
+            net_salaries: A NumPy array, array.array or any sequence of numbers.
+        Returns:
+            A tuple (taxes, percentages). Both are float64 NumPy arrays when
+            net_salaries is a NumPy array, or an array('d') and NumPy is
+            installed; otherwise array.array('d').
+        """
+        if isinstance(net_salaries, array) and net_salaries.typecode == 'd' and get_numpy() is not None:
+            # Zero-copy NumPy view, so the whole batch is computed in one vectorized pass
+            net_salaries = get_numpy().frombuffer(net_salaries)
+        np = sys.modules.get('numpy')    # an ndarray implies NumPy is imported already
+        if np is not None and isinstance(net_salaries, np.ndarray):
+            salaries = net_salaries.astype(np.float64, copy=False)
+            rate_table = np.array((0,) + self._rates, dtype=np.float64)
+            rates = rate_table[np.searchsorted(self._thresholds, salaries, side='left')]
+            taxable = salaries > self._thresholds[0]
+            with np.errstate(invalid='ignore'):    # -inf * 0 in rows that are masked out below
+                taxes = np.where(taxable, salaries * rates / 100, 0.0)
+            percentages = np.where(taxable, np.round(rates, 1), 0.0)
+            return taxes, percentages
+
+        taxes = array('d')
+        percentages = array('d')
+        for salary in net_salaries:
+            tax, percentage = self._lookup(salary)
+            taxes.append(tax)
+            percentages.append(percentage)
+        return taxes, percentages
+
+
+# Zurich schedule: 4% above 24000, plus 2% for every further 8000, below 32%.
+DEFAULT_SCHEDULE = TaxSchedule.progressive()
+
+
+def calculate_tax(net_salary, schedule=None):
     """Calculate income tax based on progressive tax brackets.
 
     This function computes the total tax owed on a given net salary using a
@@ -7,31 +157,31 @@ def calculate_tax(net_salary):
     maximum rate of 32%.
     Args:
         net_salary: The net salary amount to calculate tax on (numeric value).
+        schedule: The TaxSchedule to apply (default is DEFAULT_SCHEDULE).
     Returns:
-        A dictionary containing:
-            - 'tax': The calculated total tax amount.
-            - 'percentage': The final tax rate percentage applied (rounded to 1 decimal place).
+        A TaxResult containing:
+            - tax: The calculated total tax amount.
+            - percentage: The final tax rate percentage applied (rounded to 1 decimal place).
+        Use its _asdict() method where a {'tax': ..., 'percentage': ...} dictionary is needed.
     Note:
         - No tax is calculated if net_salary is 24000 or less.
         - The function assumes net_salary represents taxable income with
           deductions already applied.
     """
-    tax_rate = 0
-    total_tax = 0
-    taxable_income = net_salary
-    
-    if taxable_income > 24000:
-        tax_rate = 4
-        threshold = 24000
-        applied_rate = tax_rate  # track the real applied rate
-
-        while tax_rate < 32 and threshold < taxable_income:
-            if taxable_income > threshold:
-                applied_rate = tax_rate  # store rate used in calculation
-                total_tax = (taxable_income * tax_rate) / 100
-            threshold += 8000
-            tax_rate += 2
-
-        return {'tax': total_tax, 'percentage': round(applied_rate, 1)}
-
-    return {'tax': 0, 'percentage': 0}
+    return (schedule or DEFAULT_SCHEDULE).calculate(net_salary)
+
+
+def calculate_tax_batch(net_salaries, schedule=None):
+    """Calculate income tax for many net salaries in one pass.
+
+    Uses the precomputed bracket table instead of walking the brackets per
+    salary. Results are identical to calling calculate_tax on each value.
+    Args:
+        net_salaries: A NumPy array, array.array or any sequence of numbers.
+        schedule: The TaxSchedule to apply (default is DEFAULT_SCHEDULE).
+    Returns:
+        A tuple (taxes, percentages). Both are float64 NumPy arrays when
+        net_salaries is a NumPy array, or an array('d') and NumPy is
+        installed; otherwise array.array('d').
+    """
+    return (schedule or DEFAULT_SCHEDULE).calculate_batch(net_salaries)
@@ -1,7 +1,67 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import os
+import re
 import time
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from typing import List
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from RunMetrics import get_metrics
+
+# ReportLab is only imported by _load_reportlab() when the first letter is drawn, so runs
+# that never render (validation, compute-only export) do not pay its import time
+canvas = letter = stringWidth = None
+
+class TaxLetter(NamedTuple):
+    """The fields of one tax letter, in the parameter order of create_tax_letter."""
+    first_name: str
+    last_name: str
+    sex: str
+    address: str
+    gross_income: float
+    deductible: float
+    net_salary: float
+    tax_percentage: float
+    tax_amount: float
+
+
+TAX_AUTHORITY_LINES = [
+    "Steueramt Zürich",
+    "Bändliweg 21",
+    "Postfach",
+    "8090 Zürich"
+]
+
+# Increase whenever the letter layout or text changes, so cached letters are not reused
+LETTER_LAYOUT_VERSION = 1
+
+# Number of hashed subdirectory levels (256 directories each) below the output root
+SHARD_DEPTH = 2
+
+# Form XObjects holding the parts of a letter that are identical for every recipient
+LETTER_HEADER_FORM = "taxLetterHeader"
+LETTER_BODY_FORM = "taxLetterBody"
+
+# Financial lines as (distance below the address block, static label, value format),
+# matching the layout of draw_body_and_financials
+FINANCIAL_LINES = [
+    (90, "Gross Income:       CHF ", "{:,.2f}"),
+    (110, "Deductible:         CHF ", "{:,.2f}"),
+    (130, "Net Salary:         CHF ", "{:,.2f}"),
+    (150, "Tax Percentage:     ", "{:.2f}%"),
+    (170, "Tax to be Paid:     CHF ", "{:,.2f}"),
+]
+
+
+def _load_reportlab() -> None:
+    """Import the ReportLab names used by this module on first use."""
+    global canvas, letter, stringWidth
+    if canvas is None:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        from reportlab.pdfgen import canvas
 
 
 def format_timestamped_filename(first_name: str, last_name: str, suffix: str = "tax_report_letter.pdf") -> str:
@@ -19,6 +79,39 @@ def format_timestamped_filename(first_name: str, last_name: str, suffix: str = "
     return f"{first_name}_{last_name}_{timestamp}_{suffix}"
 
 
+def format_record_filename(record_id: str, first_name: str, last_name: str, output_root: str = ".",
+                           shard_depth: int = SHARD_DEPTH, suffix: str = "tax_report_letter.pdf") -> str:
+    """Build a deterministic path for a record's letter below a sharded output root.
+
+    The name is derived from the record ID instead of the clock, so letters
+    rendered in the same millisecond never overwrite each other and a rerun
+    produces the same path. The subdirectories are taken from a hash of the
+    record ID, which spreads millions of files evenly over small directories.
+    Characters that are not safe in file names are replaced; the name of
+    such an ID also gets "~" and a short hash of the original ID, so that,
+    e.g., "a/b" and "a_b" still get different files.
+
+    Args:
+        record_id: A stable identifier of the record (e.g. its ID or sequence number).
+        first_name: The first name of the recipient.
+        last_name: The last name of the recipient.
+        output_root: The directory below which letters are stored (default is ".").
+        shard_depth: The number of hashed subdirectory levels (default is SHARD_DEPTH).
+        suffix: The file suffix for the PDF (default is "tax_report_letter.pdf").
+
+    Returns:
+        The relative or absolute path of the PDF file.
+    """
+    record_id = str(record_id)
+    digest = hashlib.sha1(record_id.encode("utf-8")).hexdigest()
+    safe_id = re.sub(r"[^\w.-]", "_", record_id)
+    if safe_id != record_id:
+        # "~" is never kept from an ID, so this name cannot belong to another ID without replacements
+        safe_id = f"{safe_id}~{digest[:10]}"
+    shards = [digest[2 * level:2 * level + 2] for level in range(shard_depth)]
+    return os.path.join(output_root, *shards, f"{safe_id}_{first_name}_{last_name}_{suffix}")
+
+
 def draw_tax_authority_block(c: canvas.Canvas, width: float, height: float, lines: List[str],
                              right_margin: float = 72, top_offset: float = 60, line_height: float = 15) -> None:
     """Draw the tax authority address block at the top-right of the page.
@@ -114,9 +207,127 @@ def draw_body_and_financials(c: canvas.Canvas, text_y_start: float,
     c.drawString(left_margin, text_y, "Tax Authorities of canton Zurich")
 
 
+@lru_cache(maxsize=None)
+def _label_width(label: str) -> float:
+    _load_reportlab()
+    return stringWidth(label, "Helvetica", 12)
+
+
+def prepare_letter_templates(c: canvas.Canvas, left_margin: float = 72) -> None:
+    """Define the static letter content as reusable forms on the canvas.
+
+    The authority block, the introduction, the financial labels and the
+    closing are drawn once per document. Every letter then only references
+    them with doForm. Calling this again on the same canvas does nothing.
+
+    Args:
+        c: The reportlab canvas to define the forms on.
+        left_margin: The left margin for the body text (default is 72).
+    """
+    if c.hasForm(LETTER_HEADER_FORM):
+        return
+    _load_reportlab()
+    width, height = letter
+
+    c.beginForm(LETTER_HEADER_FORM)
+    draw_tax_authority_block(c, width, height, TAX_AUTHORITY_LINES)
+    c.endForm()
+
+    # The body is positioned relative to the bottom of the address block, so it is
+    # drawn below y=0 and translated into place for each letter.
+    c.beginForm(LETTER_BODY_FORM, lowery=-height, uppery=0)
+    c.setFont("Helvetica", 12)
+    c.drawString(left_margin, -60, "We are writing to inform you that your tax has been calculated as follows:")
+    for offset, label, _ in FINANCIAL_LINES:
+        c.drawString(100, -offset, label)
+    c.drawString(left_margin, -220, "If you have any questions regarding this calculation, please do not hesitate to contact us.")
+    c.drawString(left_margin, -240, "Best Regards,")
+    c.drawString(left_margin, -260, "Tax Authorities of canton Zurich")
+    c.endForm()
+
+
+def draw_tax_letter(c: canvas.Canvas, first_name: str, last_name: str, sex: str, address: str,
+                    gross_income: float, deductible: float, net_salary: float,
+                    tax_percentage: float, tax_amount: float, templated: bool = True) -> None:
+    """Draw one complete tax letter on the current page of the canvas.
+
+    Args:
+        c: The reportlab canvas to draw on.
+        first_name: The first name of the recipient.
+        last_name: The last name of the recipient.
+        sex: The sex of the recipient ('M' for male, otherwise female).
+        address: The address of the recipient.
+        gross_income: The gross income of the recipient.
+        deductible: The deductible amount.
+        net_salary: The net salary of the recipient.
+        tax_percentage: The tax percentage applicable.
+        tax_amount: The total tax amount to be paid.
+        templated: Reuse the static forms from prepare_letter_templates and only
+            draw the recipient specific fields (default is True).
+    """
+    _load_reportlab()
+    width, height = letter
+    if not templated:
+        draw_tax_authority_block(c, width, height, TAX_AUTHORITY_LINES)
+        address_bottom_y = draw_recipient_address(c, first_name, last_name, address, width, height)
+        draw_body_and_financials(c, address_bottom_y, sex, last_name,
+                                 gross_income, deductible, net_salary, tax_percentage, tax_amount)
+        return
+
+    prepare_letter_templates(c)
+    c.doForm(LETTER_HEADER_FORM)
+    address_bottom_y = draw_recipient_address(c, first_name, last_name, address, width, height)
+
+    c.saveState()
+    c.translate(0, address_bottom_y)
+    c.doForm(LETTER_BODY_FORM)
+    c.restoreState()
+
+    c.setFont("Helvetica", 12)
+    greeting = f"Dear Mr. {last_name}" if sex == 'M' else f"Dear Ms. {last_name}"
+    c.drawString(72, address_bottom_y - 30, greeting)
+    values = (gross_income, deductible, net_salary, tax_percentage, tax_amount)
+    for (offset, label, value_format), value in zip(FINANCIAL_LINES, values):
+        c.drawString(100 + _label_width(label), address_bottom_y - offset, value_format.format(value))
+
+
+def render_tax_letter(first_name: str, last_name: str, sex: str, address: str,
+                      gross_income: float, deductible: float, net_salary: float,
+                      tax_percentage: float, tax_amount: float, templated: bool = False) -> bytes:
+    """Render a tax letter in memory and return the PDF document as bytes.
+
+    Args:
+        first_name: The first name of the recipient.
+        last_name: The last name of the recipient.
+        sex: The sex of the recipient ('M' for male, otherwise female).
+        address: The address of the recipient.
+        gross_income: The gross income of the recipient.
+        deductible: The deductible amount.
+        net_salary: The net salary of the recipient.
+        tax_percentage: The tax percentage applicable.
+        tax_amount: The total tax amount to be paid.
+        templated: Draw the static content through forms (default is False).
+
+    Returns:
+        The content of the PDF file.
+    """
+    buffer = io.BytesIO()
+    metrics = get_metrics()
+    with metrics.stage('render'):
+        _load_reportlab()
+        c = canvas.Canvas(buffer, pagesize=letter)
+        draw_tax_letter(c, first_name, last_name, sex, address,
+                        gross_income, deductible, net_salary, tax_percentage, tax_amount, templated)
+    with metrics.stage('save'):
+        c.save()
+    return buffer.getvalue()
+
+
 def create_tax_letter(first_name: str, last_name: str, sex: str, address: str,
                       gross_income: float, deductible: float, net_salary: float,
-                      tax_percentage: float, tax_amount: float) -> str:
+                      tax_percentage: float, tax_amount: float, templated: bool = False,
+                      record_id: Optional[str] = None, output_dir: Optional[str] = None,
+                      writer=None, cache=None) -> str:
     """Create a PDF tax letter for a person.
 
     Args:
@@ -129,27 +340,138 @@ def create_tax_letter(first_name: str, last_name: str, sex: str, address: str,
         net_salary: The net salary of the recipient.
         tax_percentage: The tax percentage applicable.
         tax_amount: The total tax amount to be paid.
+        templated: Draw the static content through forms (default is False; a
+            form only pays off when it is reused on many pages of one file).
+        record_id: Name the file after this stable ID with format_record_filename
+            instead of the current timestamp.
+        output_dir: The directory to write the letter to (default is the
+            current directory). Missing directories are created.
+        writer: A LetterWriter. If given, the letter is rendered in memory and
+            handed to the writer's threads instead of being saved here.
+        cache: A LetterCache. If it already holds a letter with the same
+            content, that letter is linked to the file name instead of
+            rendering it again; otherwise the new letter is added to it.
 
     Returns:
-        The filename of the created PDF tax letter.
+        The filename of the created (or, with a writer, queued) PDF tax letter.
     """
-    tax_authority_lines = [
-        "Steueramt Zürich",
-        "Bändliweg 21",
-        "Postfach",
-        "8090 Zürich"
-    ]
+    if record_id is not None:
+        file_name = format_record_filename(record_id, first_name, last_name, output_dir or ".")
+    else:
+        file_name = format_timestamped_filename(first_name, last_name)
+        if output_dir:
+            file_name = os.path.join(output_dir, file_name)
+    metrics = get_metrics()
+    letter_args = (first_name, last_name, sex, address, gross_income, deductible, net_salary,
+                   tax_percentage, tax_amount, templated)
 
-    width, height = letter
-    file_name = format_timestamped_filename(first_name, last_name)
-    c = canvas.Canvas(file_name, pagesize=letter)
+    cache_key = None
+    if cache is not None:
+        # Amounts as floats, so a rate of 18 from calculate_tax and 18.0 from a column batch share one key
+        cache_key = cache.key(layout=LETTER_LAYOUT_VERSION, first_name=first_name, last_name=last_name,
+                              sex=sex, address=address, gross_income=float(gross_income),
+                              deductible=float(deductible), net_salary=float(net_salary),
+                              tax_percentage=float(tax_percentage), tax_amount=float(tax_amount))
+        with metrics.stage('cache'):
+            hit = cache.fetch(cache_key, file_name)
+        if hit:
+            metrics.count('cache_hits')
+            print(f"PDF '{file_name}' reused from cache!")
+            return file_name
+        metrics.count('cache_misses')
 
-    draw_tax_authority_block(c, width, height, tax_authority_lines)
-    address_bottom_y = draw_recipient_address(c, first_name, last_name, address, width, height)
-    draw_body_and_financials(c, address_bottom_y, sex, last_name,
-                             gross_income, deductible, net_salary, tax_percentage, tax_amount)
+    if writer is not None or cache is not None:
+        data = render_tax_letter(*letter_args)
+        if cache is not None:
+            cache.store(cache_key, data)
+        if writer is not None:
+            writer.submit(file_name, data)
+            metrics.count('letters_written')
+            return file_name
 
-    c.save()
+    if os.path.dirname(file_name):
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    # Write next to the target and rename, so a crash never leaves a truncated PDF and an
+    # existing file hard-linked from a LetterCache is replaced instead of overwritten
+    partial = f"{file_name}.part"
+    if cache is not None:
+        with metrics.stage('save'), open(partial, "wb") as file:
+            file.write(data)
+    else:
+        with metrics.stage('render'):
+            _load_reportlab()
+            c = canvas.Canvas(partial, pagesize=letter)
+            draw_tax_letter(c, *letter_args)
+        with metrics.stage('save'):
+            c.save()
+    os.replace(partial, file_name)
+    metrics.count('letters_written')
     print(f"PDF '{file_name}' created successfully!")
     return file_name
 
+
+def create_tax_letters_pdf(letters: Iterable[Union[TaxLetter, Dict, Tuple[str, Union[TaxLetter, Dict]]]],
+                           file_name: str, letters_per_file: Optional[int] = None,
+                           templated: bool = True) -> List[str]:
+    """Render many tax letters as the pages of one PDF, or of several shards.
+
+    All pages of a file share one canvas, so fonts and document resources are
+    set up once per file instead of once per letter. Next to the PDFs an index
+    CSV ("<name>_index.csv") maps every page to its taxpayer's record ID, name
+    and address.
+
+    Args:
+        letters: TaxLetter tuples, or dictionaries holding the create_tax_letter
+            arguments (first_name, last_name, sex, address, gross_income,
+            deductible, net_salary, tax_percentage, tax_amount). Either may be
+            paired with its record ID as (record_id, letter) to list the ID
+            in the index.
+        file_name: The PDF file name, e.g. "letters.pdf".
+        letters_per_file: Start a new shard ("letters_0001.pdf", ...) after
+            this many pages (default is a single file).
+        templated: Define the static content once per file and reuse it on
+            every page (default is True).
+
+    Returns:
+        The filenames of the created PDF files.
+    """
+    base, extension = os.path.splitext(file_name)
+    extension = extension or ".pdf"
+    if os.path.dirname(file_name):
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    created: List[str] = []
+    c = None
+    page = 0
+    metrics = get_metrics()
+
+    with open(f"{base}_index.csv", "w", newline="", encoding="utf-8") as index_file:
+        index = csv.writer(index_file)
+        index.writerow(["file", "page", "record_id", "first_name", "last_name", "address"])
+        for person in letters:
+            if c is None or (letters_per_file and page >= letters_per_file):
+                if c is not None:
+                    with metrics.stage('save'):
+                        c.save()
+                _load_reportlab()
+                shard_name = f"{base}_{len(created) + 1:04d}{extension}" if letters_per_file else base + extension
+                c = canvas.Canvas(shard_name, pagesize=letter)
+                created.append(shard_name)
+                page = 0
+            record_id = ""
+            if not isinstance(person, (TaxLetter, dict)):
+                record_id, person = person
+            if isinstance(person, dict):
+                person = TaxLetter(**person)
+            with metrics.stage('render'):
+                draw_tax_letter(c, *person, templated)
+                c.showPage()
+            metrics.count('letters_written')
+            page += 1
+            index.writerow([created[-1], page, record_id, person.first_name, person.last_name, person.address])
+
+    if c is not None:
+        with metrics.stage('save'):
+            c.save()
+    for shard_name in created:
+        print(f"PDF '{shard_name}' created successfully!")
+    return created
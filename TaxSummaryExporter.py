@@ -0,0 +1,266 @@
+"""Compute-only export of tax figures without rendering letters.
+
+For reconciliation only the computed figures of every taxpayer are needed,
+not the letters. The exporter streams an input file through validation and
+the tax calculation and writes one summary row per valid record to a single
+CSV, JSON Lines or SQLite file. Records are processed in chunks: each chunk
+is validated record by record, its taxes are computed with one
+TaxCalculator.calculate_tax_batch call, and its rows are written in bulk.
+ReportLab is never used.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+from array import array
+from contextlib import nullcontext
+from itertools import islice
+
+import TaxCalculator
+from ColumnarInputProcessor import evaluate_columns, is_columnar_file, iter_row_letters, load_columns
+from RecordStream import RecordIds, identify_records, stream_json_records
+from RecordValidator import DEFAULT_VALIDATOR
+from RunMetrics import get_metrics
+
+SUMMARY_FORMATS = ('csv', 'jsonl', 'sqlite')
+SUMMARY_EXTENSIONS = {'csv': '.csv', 'jsonl': '.jsonl', 'sqlite': '.sqlite'}
+SUMMARY_FIELDS = ('record_id', 'first_name', 'last_name', 'gross_salary', 'deductions',
+                  'net_salary', 'tax_percentage', 'tax_amount')
+DEFAULT_CHUNK_SIZE = 8192
+
+
+class _CsvSummaryWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(SUMMARY_FIELDS)
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _JsonlSummaryWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write_rows(self, rows):
+        dumps = json.dumps
+        self._file.write(''.join(dumps(dict(zip(SUMMARY_FIELDS, row)), ensure_ascii=False) + '\n'
+                                 for row in rows))
+
+    def close(self):
+        self._file.close()
+
+
+class _SqliteSummaryWriter:
+    """Write the rows into a tax_summary table of a new database that replaces the file at path.
+
+    The database is built in "<path>.part" and moved over path on close, so no
+    row of an earlier export of the same file survives.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._partial = path + '.part'
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+        self._connection = sqlite3.connect(self._partial)
+        self._connection.execute(
+            "CREATE TABLE tax_summary (record_id TEXT PRIMARY KEY, first_name TEXT, "
+            "last_name TEXT, gross_salary REAL, deductions REAL, net_salary REAL, "
+            "tax_percentage REAL, tax_amount REAL)")
+        placeholders = ', '.join('?' * len(SUMMARY_FIELDS))
+        self._insert = f"INSERT OR REPLACE INTO tax_summary VALUES ({placeholders})"
+
+    def write_rows(self, rows):
+        self._connection.executemany(self._insert, rows)
+
+    def close(self):
+        self._connection.commit()
+        self._connection.close()
+        os.replace(self._partial, self._path)
+
+
+_WRITERS = {'csv': _CsvSummaryWriter, 'jsonl': _JsonlSummaryWriter, 'sqlite': _SqliteSummaryWriter}
+
+
+def summary_file_name(input_path, output_dir, fmt):
+    """Return the summary file of an input file: "<output_dir>/<stem>_summary.<ext>"."""
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir or '.', f"{stem}_summary{SUMMARY_EXTENSIONS[fmt]}")
+
+
+def _summary_rows(record_ids, first_names, last_names, gross, deductions, net_salaries, schedule):
+    """Compute the tax of one chunk in a single batch call and return its summary rows."""
+    taxes, percentages = TaxCalculator.calculate_tax_batch(net_salaries, schedule)
+    return list(zip(record_ids, first_names, last_names, gross.tolist(), deductions.tolist(),
+                    net_salaries.tolist(), percentages.tolist(), taxes.tolist()))
+
+
+def iter_record_summaries(records, chunk_size=DEFAULT_CHUNK_SIZE, validator=None, schedule=None, shard=None,
+                          path=None, seen_ids=None):
+    """Validate and calculate person records chunk by chunk.
+
+    Args:
+        records (iterable): Person record dictionaries.
+        chunk_size (int): Number of records validated and calculated together.
+        validator (RecordValidator): Validator to use (default is DEFAULT_VALIDATOR).
+        schedule (TaxSchedule): Tax schedule to apply (default is DEFAULT_SCHEDULE).
+        shard (tuple): Only include the records of (shard_index, shard_count),
+            see RecordStream.shard_of.
+        path (str): The input file of the records; its name starts the positional record IDs.
+        seen_ids (RecordIds): The record IDs of the run so far, to also reject IDs
+            used in earlier input files (default: only compare these records).
+    Yields:
+        tuple: (rows, errors) per chunk. rows holds one tuple of SUMMARY_FIELDS
+            per valid record; errors holds (index, message) per invalid record.
+    """
+    validate = (validator or DEFAULT_VALIDATOR).validate
+    metrics = get_metrics()
+    iterator = identify_records(records, path, shard)
+    with RecordIds() if seen_ids is None else nullcontext(seen_ids) as seen_ids:
+        while chunk := list(islice(iterator, chunk_size)):
+            record_ids, first_names, last_names = [], [], []
+            gross, deductions, net_salaries = array('d'), array('d'), array('d')
+            errors = []
+            with metrics.stage('validate'):
+                duplicates = seen_ids.duplicates(((index, item.record_id) for index, item in chunk), path)
+                for index, (rid, person) in chunk:
+                    if index in duplicates:
+                        errors.append((index, str(duplicates[index])))
+                        continue
+                    record, record_errors = validate(person)
+                    if record_errors:
+                        errors.append((index, "; ".join(str(error) for error in record_errors)))
+                        continue
+                    total_deductions = record.social_deduction + record.expenses
+                    record_ids.append(rid)
+                    first_names.append(record.first_name.capitalize())
+                    last_names.append(record.last_name.capitalize())
+                    gross.append(record.gross_salary)
+                    deductions.append(total_deductions)
+                    net_salaries.append(record.gross_salary - total_deductions)
+            with metrics.stage('calculate'):
+                rows = _summary_rows(record_ids, first_names, last_names, gross, deductions, net_salaries, schedule)
+            yield rows, errors
+
+
+def iter_columnar_summaries(path, chunk_size=DEFAULT_CHUNK_SIZE, validator=None, schedule=None, shard=None,
+                            seen_ids=None):
+    """Validate and calculate a CSV, Parquet or Arrow file column-wise.
+
+    Yields (rows, errors) chunks like iter_record_summaries.
+    """
+    metrics = get_metrics()
+    with metrics.stage('parse'):
+        columns, row_count = load_columns(path)
+    with metrics.stage('columnar_eval'):
+        batch = evaluate_columns(columns, row_count, validator, schedule, path, seen_ids)
+    row_letters = iter_row_letters(batch, shard)
+    while chunk := list(islice(row_letters, chunk_size)):
+        rows = []
+        errors = []
+        for index, row_letter, row_errors in chunk:
+            if row_letter is None:
+                errors.append((index, "; ".join(str(error) for error in row_errors)))
+                continue
+            rid, letter = row_letter
+            rows.append((rid, letter.first_name, letter.last_name, letter.gross_income, letter.deductible,
+                         letter.net_salary, letter.tax_percentage, letter.tax_amount))
+        yield rows, errors
+
+
+def export_summary(path, output_path, fmt='csv', chunk_size=DEFAULT_CHUNK_SIZE, shard=None, seen_ids=None):
+    """Write the tax figures of every valid record of an input file to one summary file.
+
+    Args:
+        path (str): The .json, .jsonl, .csv, .parquet, .arrow or .feather input file.
+        output_path (str): The summary file to write.
+        fmt (str): One of SUMMARY_FORMATS: 'csv', 'jsonl' or 'sqlite'.
+        chunk_size (int): Number of records calculated and written together.
+        shard (tuple): Only export the records of (shard_index, shard_count).
+        seen_ids (RecordIds): The record IDs of the run so far, to also reject IDs
+            used in earlier input files (default: only compare the records of path).
+    Returns:
+        tuple: (exported, failed) record counts.
+    Raises:
+        OSError: If a file cannot be read or written.
+        ValueError: If the input cannot be parsed or fmt is unknown.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown summary format {fmt!r}; expected one of {', '.join(SUMMARY_FORMATS)}.")
+    metrics = get_metrics()
+    if is_columnar_file(path):
+        chunks = iter_columnar_summaries(path, chunk_size, shard=shard, seen_ids=seen_ids)
+    else:
+        records = metrics.timed_iter('parse', stream_json_records(path))
+        chunks = iter_record_summaries(records, chunk_size, shard=shard, path=path, seen_ids=seen_ids)
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    exported = failed = 0
+    writer = _WRITERS[fmt](output_path)
+    try:
+        for rows, errors in chunks:
+            for index, message in errors:
+                print(f"Record {index} skipped: {message}")
+            with metrics.stage('export'):
+                writer.write_rows(rows)
+            exported += len(rows)
+            failed += len(errors)
+    finally:
+        writer.close()
+    print(f"Summary '{output_path}' written with {exported} records.")
+    return exported, failed
+
+
+def _read_summary_rows(path, fmt):
+    """Yield lists of at most DEFAULT_CHUNK_SIZE summary rows read from a summary file."""
+    if fmt == 'sqlite':
+        connection = sqlite3.connect(path)
+        try:
+            cursor = connection.execute(f"SELECT {', '.join(SUMMARY_FIELDS)} FROM tax_summary")
+            while rows := cursor.fetchmany(DEFAULT_CHUNK_SIZE):
+                yield rows
+        finally:
+            connection.close()
+        return
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        if fmt == 'csv':
+            reader = csv.reader(file)
+            next(reader, None)    # header
+        else:
+            reader = (tuple(json.loads(line).values()) for line in file if line.strip())
+        while rows := list(islice(reader, DEFAULT_CHUNK_SIZE)):
+            yield rows
+
+
+def merge_summaries(paths, output_path, fmt='csv'):
+    """Combine summary files written by export_summary (e.g. one per shard) into one.
+
+    Args:
+        paths (list): The summary files to combine, in output order.
+        output_path (str): The combined summary file (replaced if it exists).
+        fmt (str): The format of all files: 'csv', 'jsonl' or 'sqlite'.
+    Returns:
+        int: Number of records in the combined file.
+    Raises:
+        OSError: If a file cannot be read or written.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown summary format {fmt!r}; expected one of {', '.join(SUMMARY_FORMATS)}.")
+    writer = _WRITERS[fmt](output_path)
+    count = 0
+    try:
+        for path in paths:
+            for rows in _read_summary_rows(path, fmt):
+                writer.write_rows(rows)
+                count += len(rows)
+    finally:
+        writer.close()
+    return count
@@ -0,0 +1,88 @@
+"""Benchmark letter rendering with and without the cached letter templates.
+
+Renders the same synthetic letters once with every element drawn per letter
+(plain) and once with the static content reused from form XObjects
+(templated), and prints letters per second for both. Files are written to a
+temporary directory that is removed afterwards.
+
+Usage:
+    python benchmarks/bench_letter_templates.py [--letters 2000] [--single 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import TaxPrinter
+
+
+def sample_letters(count):
+    """Return count letter argument dictionaries with varying names and figures."""
+    letters = []
+    for i in range(count):
+        gross = 40000 + (i * 137) % 160000
+        deductible = 5000 + (i * 31) % 4000
+        letters.append({
+            "first_name": f"Anna{i}",
+            "last_name": f"Muster{i}",
+            "sex": "M" if i % 2 else "F",
+            "address": f"Bahnhofstrasse {i % 200 + 1} 8001 Zürich",
+            "gross_income": gross,
+            "deductible": deductible,
+            "net_salary": gross - deductible,
+            "tax_percentage": 12.0,
+            "tax_amount": (gross - deductible) * 0.12,
+        })
+    return letters
+
+
+def bench_combined(letters, directory, templated):
+    start = time.perf_counter()
+    TaxPrinter.create_tax_letters_pdf(letters, os.path.join(directory, f"combined_{templated}.pdf"),
+                                      templated=templated)
+    return len(letters) / (time.perf_counter() - start)
+
+
+def bench_single(letters, directory, templated):
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        start = time.perf_counter()
+        for person in letters:
+            TaxPrinter.create_tax_letter(**person, templated=templated)
+        return len(letters) / (time.perf_counter() - start)
+    finally:
+        os.chdir(cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--letters", type=int, default=2000, help="letters rendered into one combined PDF")
+    parser.add_argument("--single", type=int, default=200, help="letters rendered as separate PDF files")
+    args = parser.parse_args()
+
+    combined = sample_letters(args.letters)
+    single = sample_letters(args.single)
+    with tempfile.TemporaryDirectory() as directory:
+        # create_tax_letter prints one line per file; keep the report readable
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        try:
+            results = {
+                "combined": (bench_combined(combined, directory, False), bench_combined(combined, directory, True)),
+                "single": (bench_single(single, directory, False), bench_single(single, directory, True)),
+            }
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    print(f"{'mode':<10}{'plain':>14}{'templated':>14}{'speedup':>10}")
+    for mode, (plain, templated) in results.items():
+        print(f"{mode:<10}{plain:>10.0f} l/s{templated:>10.0f} l/s{templated / plain:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
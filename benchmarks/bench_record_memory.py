@@ -0,0 +1,75 @@
+"""Benchmark the memory held per record by the in-memory pipeline types.
+
+Keeps the validated record, the tax result and the letter fields of every
+synthetic taxpayer alive, once as the dictionaries the pipeline used to pass
+around and once as the TaxRecord, TaxResult and TaxLetter tuples it uses now,
+and prints the traced bytes per record of both.
+
+Usage:
+    python benchmarks/bench_record_memory.py [--records 100000]
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from JsonInputProcessor import prepare_letter
+from RecordValidator import DEFAULT_VALIDATOR
+from TaxCalculator import calculate_tax
+from synthetic_data import generate_records
+
+
+def as_dicts(person):
+    """Return (record, result, letter) as the dictionaries used before the compact types."""
+    record = DEFAULT_VALIDATOR.validate(person)[0]._asdict()
+    deductible = record['social_deduction'] + record['expenses']
+    net_salary = record['gross_salary'] - deductible
+    result = calculate_tax(net_salary)._asdict()
+    letter = {
+        'first_name': record['first_name'].capitalize(), 'last_name': record['last_name'].capitalize(),
+        'sex': record['sex'], 'address': record['address'], 'gross_income': record['gross_salary'],
+        'deductible': deductible, 'net_salary': net_salary,
+        'tax_percentage': result['percentage'], 'tax_amount': result['tax'],
+    }
+    return record, result, letter
+
+
+def as_tuples(person):
+    """Return (record, result, letter) as TaxRecord, TaxResult and TaxLetter."""
+    record = DEFAULT_VALIDATOR.validate(person)[0]
+    letter = prepare_letter(person)
+    return record, calculate_tax(letter.net_salary), letter
+
+
+def bytes_per_record(build, people):
+    """Return the traced memory in bytes per record retained by build() for all people."""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        kept = [build(person) for person in people]
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return retained / len(kept)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000, help="number of records (default: 100000)")
+    args = parser.parse_args()
+
+    people = list(generate_records(args.records, seed=1))
+    dicts = bytes_per_record(as_dicts, people)
+    tuples = bytes_per_record(as_tuples, people)
+    print(f"{'representation':<28}{'bytes/record':>14}")
+    print(f"{'dict record/result/letter':<28}{dicts:>14.1f}")
+    print(f"{'TaxRecord/TaxResult/Letter':<28}{tuples:>14.1f}")
+    print(f"reduction: {(1 - tuples / dicts) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark interpreter startup and import time of the application.
+
+Starts a fresh interpreter several times for each scenario and reports the
+median wall time:
+
+    import Main             what every run pays before doing any work
+    import Main + ReportLab what the first rendered letter adds on top
+
+It also checks that importing Main does not import ReportLab, so validation,
+dry and compute-only runs never load it.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    ("python -c pass", "pass"),
+    ("import Main", "import Main"),
+    ("import Main + ReportLab", "import Main, TaxPrinter; TaxPrinter._load_reportlab()"),
+]
+
+
+def time_startup(code, runs):
+    """Return the median wall time in seconds of running code in a fresh interpreter."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def reportlab_loaded_by_main():
+    """Return True if importing Main imports ReportLab."""
+    result = subprocess.run([sys.executable, "-c", "import sys, Main; print('reportlab' in sys.modules)"],
+                            cwd=ROOT, check=True, capture_output=True, text=True)
+    return result.stdout.strip() == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15, help="interpreter starts per scenario (default: 15)")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<26} {'median ms':>10}")
+    for name, code in SCENARIOS:
+        print(f"{name:<26} {time_startup(code, args.runs) * 1000:>10.1f}")
+    print(f"ReportLab imported by 'import Main': {reportlab_loaded_by_main()}")
+
+
+if __name__ == "__main__":
+    main()
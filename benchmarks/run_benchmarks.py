@@ -0,0 +1,172 @@
+"""Throughput benchmarks for validation, tax calculation and PDF rendering.
+
+Runs every stage over synthetic taxpayer records of each requested size and
+reports per-record latency percentiles, records per second and peak traced
+memory. Results are printed as a table and can be written as JSON and compared
+against an earlier run. Everything runs offline; letters are rendered into a
+temporary directory.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 10 10000 1000000] [--render-limit 1000]
+                                        [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import TaxCalculator
+import TaxPrinter
+from JsonInputProcessor import prepare_letter, record_id
+from RecordValidator import DEFAULT_VALIDATOR
+from synthetic_data import generate_records
+
+PERCENTILES = (50, 90, 99)
+
+
+def net_salary(record):
+    return record["gross_salary"] - record["social_deduction"] - record["expenses"]
+
+
+def percentile(sorted_values, pct):
+    """Return the nearest-rank percentile of an already sorted sequence."""
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def time_per_item(func, items):
+    """Call func on every item and return the per-call latencies in seconds."""
+    clock = time.perf_counter
+    latencies = array("d")
+    for item in items:
+        start = clock()
+        func(item)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def traced_peak(func, items):
+    """Return the peak traced memory in bytes while calling func on every item."""
+    tracemalloc.start()
+    try:
+        for item in items:
+            func(item)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(stage, size, latencies, peak_bytes):
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    result = {
+        "stage": stage,
+        "records": size,
+        "measured": len(ordered),
+        "seconds": total,
+        "records_per_sec": len(ordered) / total if total else 0.0,
+        "peak_traced_bytes": peak_bytes,
+    }
+    for pct in PERCENTILES:
+        result[f"p{pct}_us"] = percentile(ordered, pct) * 1e6 if ordered else None
+    result["max_us"] = ordered[-1] * 1e6 if ordered else None
+    return result
+
+
+def bench_size(size, render_limit, measure_memory, seed):
+    records = lambda limit=size: generate_records(limit, seed)
+    results = []
+
+    stages = [
+        ("validate", DEFAULT_VALIDATOR.validate, records),
+        ("calculate_tax", lambda record: TaxCalculator.calculate_tax(net_salary(record)), records),
+    ]
+    for stage, func, items in stages:
+        latencies = time_per_item(func, items())
+        peak = traced_peak(func, items()) if measure_memory else None
+        results.append(summarize(stage, size, latencies, peak))
+
+    # The batch API has no per-record latency; report the time of the whole call.
+    salaries = array("d", (net_salary(record) for record in records()))
+    start = time.perf_counter()
+    TaxCalculator.calculate_tax_batch(salaries)
+    elapsed = time.perf_counter() - start
+    batch = summarize("calculate_tax_batch", size, array("d"), None)
+    batch.update(measured=size, seconds=elapsed, records_per_sec=size / elapsed if elapsed else 0.0)
+    results.append(batch)
+
+    if render_limit:
+        rendered = min(size, render_limit)
+        letters = [(record_id(record, index), prepare_letter(record))
+                   for index, record in enumerate(records(rendered))]
+        with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull, \
+                contextlib.redirect_stdout(devnull):
+            render = lambda item: TaxPrinter.create_tax_letter(*item[1], record_id=item[0], output_dir=directory)
+            latencies = time_per_item(render, letters)
+            peak = traced_peak(render, letters[:100]) if measure_memory else None
+        results.append(summarize("create_tax_letter", size, latencies, peak))
+    return results
+
+
+def _cell(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def print_table(results, baseline=None):
+    reference = {(r["stage"], r["records"]): r for r in (baseline or {}).get("results", [])}
+    print(f"{'stage':<22}{'records':>10}{'rec/s':>14}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}"
+          f"{'peak KiB':>10}{'vs base':>9}")
+    for r in results:
+        peak = _cell(r["peak_traced_bytes"] and r["peak_traced_bytes"] / 1024, ".0f")
+        base = reference.get((r["stage"], r["records"]))
+        ratio = f"{r['records_per_sec'] / base['records_per_sec']:.2f}x" if base and base["records_per_sec"] else "-"
+        print(f"{r['stage']:<22}{r['records']:>10}{r['records_per_sec']:>14,.0f}{_cell(r['p50_us'], '.1f'):>10}"
+              f"{_cell(r['p90_us'], '.1f'):>10}{_cell(r['p99_us'], '.1f'):>10}{peak:>10}{ratio:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 10000, 1000000],
+                        help="numbers of synthetic records (default: 10 10000 1000000)")
+    parser.add_argument("--render-limit", type=int, default=1000,
+                        help="render at most this many letters per size, 0 to skip rendering (default: 1000)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare throughput against")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(bench_size(size, args.render_limit, not args.no_memory, args.seed))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+    print_table(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
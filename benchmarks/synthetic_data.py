@@ -0,0 +1,69 @@
+"""Deterministic synthetic taxpayer records for benchmarks and load tests.
+
+Usage:
+    python benchmarks/synthetic_data.py 10000 taxpayers.jsonl [--seed 1] [--invalid-ratio 0.01]
+"""
+
+import argparse
+import json
+import random
+
+FIRST_NAMES = ["Anna", "Max", "Lea", "Luca", "Mia", "Noah", "Sara", "Elias", "Lina", "Jonas"]
+LAST_NAMES = ["Muster", "Meier", "Keller", "Weber", "Huber", "Schneider", "Brunner", "Baumann"]
+STREETS = ["Bahnhofstrasse", "Seestrasse", "Dorfstrasse", "General Weberstrasse", "Kirchweg"]
+CITIES = [("8001", "Zürich"), ("8400", "Winterthur"), ("8600", "Dübendorf"), ("8700", "Küsnacht")]
+
+
+def generate_records(count, seed=0, invalid_ratio=0.0):
+    """Yield count taxpayer records; the same seed always yields the same records.
+
+    Args:
+        count: Number of records to generate.
+        seed: Seed of the random generator.
+        invalid_ratio: Share of records made invalid (digit in the first name).
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        zipcode, city = rng.choice(CITIES)
+        gross = round(rng.uniform(20000, 250000), 2)
+        record = {
+            "id": f"R{i:09d}",
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "sex": rng.choice(["M", "F"]),
+            "address": f"{rng.choice(STREETS)} {rng.randint(1, 200)} {zipcode} {city}",
+            "gross_salary": gross,
+            "social_deduction": round(gross * 0.064, 2),
+            "expenses": round(rng.uniform(0, 8000), 2),
+        }
+        if invalid_ratio and rng.random() < invalid_ratio:
+            record["first_name"] += "1"
+        yield record
+
+
+def write_records(path, count, seed=0, invalid_ratio=0.0):
+    """Write generated records to a .json (array) or .jsonl file without holding them in memory."""
+    records = generate_records(count, seed, invalid_ratio)
+    with open(path, "w", encoding="utf-8") as file:
+        if path.lower().endswith(".jsonl"):
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        file.write("[\n")
+        for i, record in enumerate(records):
+            file.write((",\n" if i else "") + json.dumps(record, ensure_ascii=False))
+        file.write("\n]\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("count", type=int)
+    parser.add_argument("path", help="output file, .json or .jsonl")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--invalid-ratio", type=float, default=0.0)
+    args = parser.parse_args()
+    write_records(args.path, args.count, args.seed, args.invalid_ratio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Equivalence of the batch and per-record tax calculation.
+
+calculate_tax_batch must return exactly what calculate_tax returns for every
+value, on the NumPy path (taken for array('d') input whenever NumPy is
+installed) and on the array('d') fallback, and the compiled
+TaxSchedule must match the original bracket loop of calculate_tax.
+"""
+
+import math
+import os
+import random
+import sys
+from array import array
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import TaxCalculator
+from TaxCalculator import DEFAULT_SCHEDULE, TaxSchedule, calculate_tax, calculate_tax_batch
+
+
+def original_calculate_tax(net_salary):
+    """The bracket loop calculate_tax used before the schedule was precompiled."""
+    tax_rate = 0
+    total_tax = 0
+    taxable_income = net_salary
+
+    if taxable_income > 24000:
+        tax_rate = 4
+        threshold = 24000
+        applied_rate = tax_rate
+
+        while tax_rate < 32 and threshold < taxable_income:
+            if taxable_income > threshold:
+                applied_rate = tax_rate
+                total_tax = (taxable_income * tax_rate) / 100
+            threshold += 8000
+            tax_rate += 2
+
+        return {'tax': total_tax, 'percentage': round(applied_rate, 1)}
+
+    return {'tax': 0, 'percentage': 0}
+
+
+def edge_values():
+    """Bracket thresholds and their neighbours, values <= 0, NaN and large values."""
+    values = [0.0, -0.0, -1.0, -1e9, 1e-9, 1.0, 23999.99, 1e7, 1e12, 1e300, math.inf, -math.inf]
+    for k in range(-1, 17):
+        threshold = 24000 + 8000 * k
+        values += [threshold, math.nextafter(threshold, -math.inf), math.nextafter(threshold, math.inf),
+                   threshold - 0.01, threshold + 0.01]
+    return values
+
+
+def sample_values():
+    rng = random.Random(3)
+    return edge_values() + [rng.uniform(-1000, 200000) for _ in range(5000)] + [math.nan]
+
+
+def same(expected, actual):
+    return expected == actual or (math.isnan(expected) and math.isnan(actual))
+
+
+def assert_matches_scalar(values, taxes, percentages):
+    assert len(taxes) == len(percentages) == len(values)
+    for value, tax, percentage in zip(values, taxes, percentages):
+        expected = calculate_tax(value)
+        assert same(expected.tax, tax), value
+        assert same(expected.percentage, percentage), value
+
+
+@pytest.mark.parametrize('container', [array, list], ids=['array', 'list'])
+def test_batch_matches_calculate_tax_without_numpy(container, monkeypatch):
+    monkeypatch.setattr(TaxCalculator, '_numpy', False)    # as if NumPy were not installed
+    values = sample_values()
+    data = array('d', values) if container is array else values
+    taxes, percentages = calculate_tax_batch(data)
+    assert isinstance(taxes, array) and isinstance(percentages, array)
+    assert_matches_scalar(values, taxes, percentages)
+
+
+@pytest.mark.parametrize('container', ['ndarray', array], ids=['ndarray', 'array'])
+def test_batch_matches_calculate_tax_with_numpy(container):
+    np = pytest.importorskip('numpy')
+    values = sample_values()
+    data = np.array(values, dtype=np.float64) if container == 'ndarray' else array('d', values)
+    taxes, percentages = calculate_tax_batch(data)
+    assert isinstance(taxes, np.ndarray) and isinstance(percentages, np.ndarray)
+    assert_matches_scalar(values, taxes.tolist(), percentages.tolist())
+
+
+def test_batch_of_nothing():
+    taxes, percentages = calculate_tax_batch(array('d'))
+    assert len(taxes) == len(percentages) == 0
+
+
+def test_nan_is_not_taxed():
+    assert calculate_tax(math.nan) == (0, 0)
+
+
+def test_progressive_schedule_matches_original_loop():
+    schedule = TaxSchedule.progressive()
+    assert schedule.thresholds == DEFAULT_SCHEDULE.thresholds
+    assert schedule.rates == DEFAULT_SCHEDULE.rates
+    for value in sample_values()[:-1]:
+        assert schedule.calculate(value)._asdict() == original_calculate_tax(value), value